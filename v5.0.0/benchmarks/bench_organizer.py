@@ -0,0 +1,517 @@
+"""
+Microbenchmarks for the File Organizer v5.0.0 hot paths
+
+Builds synthetic source and destination trees in a temp directory and
+times each stage separately:
+
+    get_file_type_category, should_exclude, get_file_hash,
+    handle_duplicate, organize_file, organize_existing_files,
+    pending_schedule (also reports memory per pending entry),
+    pending_tick (next_deadline + pop_due per wakeup over --tick-pending
+    files with deadlines spread across 30 minutes; memory per entry too),
+    modify_events (repeated on_modified events for files being written),
+    classify_files (destination lookup with content sniffing, half of the
+    files without a usable extension; reports header reads),
+    snapshot_poll (polling backend on a --poll-files tree: quiet poll,
+    poll after changes and memory per file, next to watchdog's
+    DirectorySnapshot; use --poll-files 1000000 for the network share case)
+
+Results are written as JSON and can be compared against a stored
+baseline; any benchmark slower than the baseline by more than the
+threshold fails the run (exit code 1). A baseline recorded with
+different workload options is refused (exit code 2).
+
+Usage:
+    python benchmarks/bench_organizer.py --output results.json
+    python benchmarks/bench_organizer.py --baseline baseline.json --threshold 0.20
+    python benchmarks/bench_organizer.py --only organize_existing_files --log queue
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import types
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import file_organizer_v5 as organizer
+from watchdog.events import FileCreatedEvent, FileModifiedEvent
+from watchdog.utils.dirsnapshot import DirectorySnapshot, DirectorySnapshotDiff
+
+DEFAULT_SIZES = "4096:0.70,65536:0.20,1048576:0.09,16777216:0.01"
+
+# Benchmark Environment
+class BenchEnvironment:
+    """Synthetic source/destination trees plus a handler wired to them"""
+
+    def __init__(self, root, settings=None):
+        self.root = root
+        self.source = os.path.join(root, "source")
+        self.dest_drive = os.path.join(root, "dest") + os.sep
+        os.makedirs(self.source, exist_ok=True)
+        os.makedirs(self.dest_drive, exist_ok=True)
+
+        config_file = os.path.join(root, "config.json")
+        with open(config_file, "w", encoding="utf-8") as f:
+            json.dump(settings or {}, f)
+        self.config = organizer.ConfigManager(config_file)
+        self.config.settings["statistics"]["stats_file"] = os.path.join(root, "statistics.json")
+        self.config.settings["index"]["index_file"] = os.path.join(root, "content_index.db")
+
+        self.source_config = {
+            "name": "Bench",
+            "folder": self.source,  # absolute, so Path.home() / folder == folder
+            "destination_drive": self.dest_drive,
+            "destination_folder": "IN_MSG",
+            "enabled": True
+        }
+        self.statistics = organizer.StatisticsTracker(
+            stats_file=self.config.settings["statistics"]["stats_file"],
+            flush_interval_seconds=0
+        )
+        self.index = None
+        if self.config.settings["index"].get("enabled", True):
+            self.index = organizer.ContentIndex(self.config.settings["index"]["index_file"])
+        self.handler = organizer.AdvancedFileOrganizerHandler(
+            self.source_config, self.config, self.statistics, self.index
+        )
+
+    def close(self):
+        self.statistics.close()
+        if self.index is not None:
+            self.index.close()
+
+def parse_sizes(spec):
+    """Parse "size:weight,size:weight" into two lists"""
+    sizes, weights = [], []
+    for part in spec.split(","):
+        size, weight = part.split(":")
+        sizes.append(int(size))
+        weights.append(float(weight))
+    return sizes, weights
+
+def random_names(rng, count, extensions):
+    """Distinct file names spread over the given extensions"""
+    return [f"file_{i:07d}{rng.choice(extensions)}" for i in range(count)]
+
+def random_bytes(rng, count):
+    """Seeded pseudo-random bytes"""
+    return rng.getrandbits(count * 8).to_bytes(count, "little")
+
+def write_file(path, size, rng):
+    """Write a file of the given size with pseudo-random content"""
+    block = random_bytes(rng, min(size, 65536) or 1)
+    with open(path, "wb") as f:
+        remaining = size
+        while remaining > 0:
+            piece = block[:remaining]
+            f.write(piece)
+            remaining -= len(piece)
+
+def populate_sources(env, rng, count, sizes, weights, collision_rate):
+    """Create source files; a share of them collide with existing destination files"""
+    rules = env.handler.rules
+    extensions = sorted(rules.ext_to_category) or [".txt"]
+    total = 0
+    for name in random_names(rng, count, extensions):
+        size = rng.choices(sizes, weights)[0]
+        path = os.path.join(env.source, name)
+        write_file(path, size, rng)
+        total += size
+        if rng.random() < collision_rate:
+            dest_path, _ = env.handler.get_destination_path(path)
+            os.makedirs(dest_path, exist_ok=True)
+            dest_file = os.path.join(dest_path, name)
+            if rng.random() < 0.5:
+                shutil.copy2(path, dest_file)
+            else:
+                write_file(dest_file, size, rng)
+                os.utime(dest_file, (time.time() + 60, time.time() + 60))
+    return total
+
+def result(ops, seconds, total_bytes=None):
+    """Normalize one benchmark result"""
+    entry = {
+        "ops": ops,
+        "seconds": seconds,
+        "per_op_us": seconds / ops * 1e6 if ops else 0.0
+    }
+    if total_bytes is not None:
+        entry["mb_per_s"] = total_bytes / 1048576 / seconds if seconds else 0.0
+    return entry
+
+# Benchmarks
+def bench_get_file_type_category(env, args, rng):
+    extensions = sorted(env.handler.rules.ext_to_category) + [".unknown", ".zzz"]
+    lookups = [rng.choice(extensions) for _ in range(args.lookups)]
+    best = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        for ext in lookups:
+            env.handler.get_file_type_category(ext)
+        best = min(best, time.perf_counter() - start)
+    return result(len(lookups), best)
+
+def bench_should_exclude(env, args, rng):
+    extensions = sorted(env.handler.rules.ext_to_category) + [".tmp", ".part"]
+    names = random_names(rng, args.lookups, extensions)
+    names[::17] = ["." + n for n in names[::17]]
+    names[::23] = ["desktop.ini"] * len(names[::23])
+    best = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        for name in names:
+            env.handler.should_exclude(name)
+        best = min(best, time.perf_counter() - start)
+    return result(len(names), best)
+
+def bench_get_file_hash(env, args, rng):
+    sizes, weights = parse_sizes(args.sizes)
+    hash_dir = os.path.join(env.root, "hash")
+    os.makedirs(hash_dir)
+    paths, total = [], 0
+    for i in range(args.hash_files):
+        size = rng.choices(sizes, weights)[0]
+        path = os.path.join(hash_dir, f"h{i}.bin")
+        write_file(path, size, rng)
+        paths.append(path)
+        total += size
+    best = float("inf")
+    for _ in range(args.repeat):
+        env.handler.duplicates.hasher.clear_cache()
+        start = time.perf_counter()
+        for path in paths:
+            env.handler.get_file_hash(path)
+        best = min(best, time.perf_counter() - start)
+    return result(len(paths), best, total)
+
+def bench_handle_duplicate(env, args, rng):
+    sizes, weights = parse_sizes(args.sizes)
+    pairs, total = [], 0
+    dest_dir = os.path.join(env.dest_drive, "IN_MSG", "dups")
+    os.makedirs(dest_dir)
+    for i in range(args.duplicates):
+        size = rng.choices(sizes, weights)[0]
+        source = os.path.join(env.source, f"dup_{i}.bin")
+        dest = os.path.join(dest_dir, f"dup_{i}.bin")
+        write_file(source, size, rng)
+        kind = i % 3
+        if kind == 0:
+            shutil.copy2(source, dest)                      # identical
+        elif kind == 1:
+            write_file(dest, size, rng)                     # same size, other content
+        else:
+            write_file(dest, size + 1, rng)                 # different size
+        os.utime(dest, (time.time() + 60, time.time() + 60))
+        pairs.append((source, dest))
+        total += size
+    start = time.perf_counter()
+    for source, dest in pairs:
+        env.handler.handle_duplicate(source, dest)
+    return result(len(pairs), time.perf_counter() - start, total)
+
+def bench_organize_file(env, args, rng):
+    sizes, weights = parse_sizes(args.sizes)
+    total = populate_sources(env, rng, args.files, sizes, weights, args.collision_rate)
+    paths = [entry.path for entry in os.scandir(env.source)]
+    start = time.perf_counter()
+    for path in paths:
+        env.handler.organize_file(path)
+    return result(len(paths), time.perf_counter() - start, total)
+
+def bench_organize_existing_files(env, args, rng):
+    sizes, weights = parse_sizes(args.sizes)
+    total = populate_sources(env, rng, args.files, sizes, weights, args.collision_rate)
+    start = time.perf_counter()
+    env.handler.organize_existing_files()
+    return result(args.files, time.perf_counter() - start, total)
+
+def bench_pending_schedule(env, args, rng):
+    # Paths arrive as fresh strings from file events, so build them per call
+    folders = [os.path.join(env.source, "sync", f"folder_{i:03d}") for i in range(50)]
+    scheduler = organizer.PendingScheduler()
+    now = time.monotonic()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    for i in range(args.pending):
+        scheduler.schedule(os.path.join(folders[i % 50], f"IMG_{i:08d}.jpg"), now + 60)
+    seconds = time.perf_counter() - start
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    entry = result(args.pending, seconds)
+    entry["bytes_per_entry"] = (after - before) / args.pending
+    return entry
+
+def bench_pending_tick(env, args, rng):
+    # Deadlines spread over a 30 minute delay window, so most ticks hold a few files
+    folders = [os.path.join(env.source, "sync", f"folder_{i:03d}") for i in range(50)]
+    scheduler = organizer.PendingScheduler()
+    now = time.monotonic()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(args.tick_pending):
+        scheduler.schedule(os.path.join(folders[i % 50], f"IMG_{i:08d}.jpg"), now + rng.uniform(0, 1800))
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Wake at each earliest deadline, like the runtimes' timers, until the queue drains
+    ticks = popped = 0
+    start = time.perf_counter()
+    deadline = scheduler.next_deadline()
+    while deadline is not None:
+        popped += len(scheduler.pop_due(deadline))
+        ticks += 1
+        deadline = scheduler.next_deadline()
+    entry = result(ticks, time.perf_counter() - start)
+    entry["bytes_per_entry"] = (after - before) / args.tick_pending
+    entry["popped"] = popped
+    return entry
+
+def bench_modify_events(env, args, rng):
+    # A few large downloads, each firing a burst of modify events
+    paths = [os.path.join(env.source, f"download_{i}.zip") for i in range(10)]
+    for path in paths:
+        env.handler.on_created(FileCreatedEvent(path))
+    events = [FileModifiedEvent(paths[i % len(paths)]) for i in range(args.lookups)]
+    start = time.perf_counter()
+    for event in events:
+        env.handler.on_modified(event)
+    return result(len(events), time.perf_counter() - start)
+
+def bench_classify_files(env, args, rng):
+    # Half the files have a known extension, half are extensionless downloads
+    headers = [b"%PDF-1.7\n", b"\x89PNG\r\n\x1a\n", b"PK\x03\x04", b"ID3\x03", b"plain text"]
+    extensions = sorted(env.handler.rules.ext_to_category)
+    paths = []
+    for i in range(min(args.files, 2000)):
+        name = f"file_{i}" if i % 2 else f"file_{i}{rng.choice(extensions)}"
+        path = os.path.join(env.source, name)
+        with open(path, "wb") as f:
+            f.write(rng.choice(headers) + random_bytes(rng, 4096))
+        paths.append(path)
+    env.handler.sniffer = organizer.ContentSniffer()
+    best = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        for path in paths:
+            env.handler.get_destination_path(path)
+        best = min(best, time.perf_counter() - start)
+    entry = result(len(paths), best)
+    entry["header_reads"] = env.handler.sniffer.reads
+    return entry
+
+def bench_snapshot_poll(env, args, rng):
+    # A synced share: folders of 1,000 files, two levels deep
+    tree = os.path.join(env.source, "share")
+    folders = []
+    for d in range((args.poll_files + 999) // 1000):
+        folder = os.path.join(tree, f"year_{d // 100:02d}", f"album_{d:04d}")
+        os.makedirs(folder)
+        folders.append(folder)
+        for i in range(min(1000, args.poll_files - d * 1000)):
+            open(os.path.join(folder, f"IMG_{i:05d}.jpg"), "wb").close()
+    
+    snapshot = organizer.PollSnapshot(tree, recursive=True)
+    tracemalloc.start()
+    start = time.perf_counter()
+    snapshot.poll()
+    initial = time.perf_counter() - start
+    snapshot_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    
+    best = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        snapshot.poll()
+        best = min(best, time.perf_counter() - start)
+    
+    # 100 new files spread over 10 folders
+    for folder in rng.sample(folders, min(10, len(folders))):
+        for i in range(10):
+            open(os.path.join(folder, f"NEW_{i:02d}.jpg"), "wb").close()
+    start = time.perf_counter()
+    events = snapshot.poll()
+    changed = time.perf_counter() - start
+    
+    # Reference: watchdog's generic polling (full snapshot and diff each interval)
+    tracemalloc.start()
+    reference = DirectorySnapshot(tree)
+    reference_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    DirectorySnapshotDiff(reference, DirectorySnapshot(tree))
+    reference_poll = time.perf_counter() - start
+    
+    entry = result(args.poll_files, best)
+    entry.update({
+        "initial_seconds": initial,
+        "changed_poll_seconds": changed,
+        "events": len(events),
+        "bytes_per_entry": snapshot_bytes / args.poll_files,
+        "watchdog_poll_seconds": reference_poll,
+        "watchdog_bytes_per_entry": reference_bytes / args.poll_files
+    })
+    return entry
+
+BENCHMARKS = {
+    "get_file_type_category": bench_get_file_type_category,
+    "should_exclude": bench_should_exclude,
+    "get_file_hash": bench_get_file_hash,
+    "handle_duplicate": bench_handle_duplicate,
+    "organize_file": bench_organize_file,
+    "organize_existing_files": bench_organize_existing_files,
+    "pending_schedule": bench_pending_schedule,
+    "pending_tick": bench_pending_tick,
+    "modify_events": bench_modify_events,
+    "classify_files": bench_classify_files,
+    "snapshot_poll": bench_snapshot_poll,
+}
+
+def run_benchmarks(args):
+    """Run each selected benchmark in a fresh environment"""
+    results = {}
+    for name in args.only or BENCHMARKS:
+        rng = random.Random(args.seed)
+        root = tempfile.mkdtemp(prefix=f"bench-{name}-")
+        env = BenchEnvironment(root)
+        try:
+            results[name] = BENCHMARKS[name](env, args, rng)
+        finally:
+            env.close()
+            shutil.rmtree(root, ignore_errors=True)
+        entry = results[name]
+        extra = f", {entry['mb_per_s']:.1f} MB/s" if "mb_per_s" in entry else ""
+        if "bytes_per_entry" in entry:
+            extra += f", {entry['bytes_per_entry']:.0f} B/entry"
+        if "watchdog_poll_seconds" in entry:
+            extra += (f", quiet poll {entry['seconds'] * 1000:.1f} ms, after changes "
+                      f"{entry['changed_poll_seconds'] * 1000:.1f} ms"
+                      f" ({entry['events']} events), watchdog {entry['watchdog_poll_seconds']:.2f}s"
+                      f" / {entry['watchdog_bytes_per_entry']:.0f} B/entry")
+        if "popped" in entry:
+            extra += f", {entry['popped']:,} files popped"
+        if "header_reads" in entry:
+            extra += f", {entry['header_reads']:,} header reads"
+        print(f"   {name:25} {entry['per_op_us']:12.2f} µs/op  ({entry['ops']:,} ops{extra})")
+    return results
+
+WORKLOAD_ARGS = ("files", "lookups", "hash_files", "duplicates", "pending", "tick_pending",
+                 "poll_files", "sizes", "collision_rate", "repeat", "seed", "metrics",
+                 "log", "log_format")
+
+def workload_params(args):
+    """Every option that shapes the workload, as recorded in the report"""
+    return {name: getattr(args, name) for name in WORKLOAD_ARGS}
+
+def param_mismatches(params, baseline_params):
+    """(name, current, baseline) for each workload option that differs"""
+    return [(name, params[name], baseline_params.get(name))
+            for name in WORKLOAD_ARGS if params[name] != baseline_params.get(name)]
+
+def compare_to_baseline(results, baseline, threshold):
+    """Return the benchmarks slower than baseline by more than threshold"""
+    regressions = []
+    for name, entry in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base or not base.get("per_op_us"):
+            continue
+        ratio = entry["per_op_us"] / base["per_op_us"]
+        marker = "❌" if ratio > 1 + threshold else "✓"
+        print(f"   {marker} {name:25} {ratio:6.2f}x baseline")
+        if ratio > 1 + threshold:
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="File Organizer hot-path microbenchmarks")
+    parser.add_argument("--files", type=int, default=2000, help="source files for organize benchmarks")
+    parser.add_argument("--lookups", type=int, default=100000, help="calls for lookup benchmarks")
+    parser.add_argument("--hash-files", type=int, default=200, help="files for get_file_hash")
+    parser.add_argument("--duplicates", type=int, default=300, help="colliding pairs for handle_duplicate")
+    parser.add_argument("--pending", type=int, default=200000, help="paths for pending_schedule")
+    parser.add_argument("--tick-pending", type=int, default=100000, help="paths for pending_tick")
+    parser.add_argument("--poll-files", type=int, default=100000, help="files for snapshot_poll")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="size:weight list for synthetic files")
+    parser.add_argument("--collision-rate", type=float, default=0.1, help="share of files that collide by name")
+    parser.add_argument("--repeat", type=int, default=3, help="repetitions for non-mutating benchmarks")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--metrics", action="store_true", help="enable stage metrics while timing")
+    parser.add_argument("--log", choices=["none", "sync", "queue"], default="none",
+                        help="log at INFO to a temp file, directly or through the log queue")
+    parser.add_argument("--log-format", choices=["text", "json"], default="text")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="run a subset")
+    parser.add_argument("--output", help="write results JSON to this file")
+    parser.add_argument("--baseline", help="compare against a results JSON file")
+    parser.add_argument("--threshold", type=float, default=0.20, help="allowed slowdown vs baseline (0.20 = 20%%)")
+    args = parser.parse_args()
+
+    log_dir = None
+    if args.log == "none":
+        logging.basicConfig(level=logging.WARNING)
+    else:
+        log_dir = tempfile.mkdtemp(prefix="bench-log-")
+        organizer.setup_logging(types.SimpleNamespace(settings={"logging": {
+            "log_level": "INFO",
+            "console_output": False,
+            "log_to_file": True,
+            "log_file": os.path.join(log_dir, "bench.log"),
+            "format": args.log_format,
+            "queue": args.log == "queue",
+            "queue_full_policy": "block"
+        }}))
+    if args.metrics:
+        organizer.enable_metrics()
+
+    # Refuse up front to compare runs of different workloads
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        mismatched = param_mismatches(workload_params(args), baseline.get("params", {}))
+        if mismatched:
+            print(f"\n❌ {args.baseline} was recorded with different parameters:")
+            for name, ours, theirs in mismatched:
+                print(f"   {name}: {theirs!r} in the baseline, {ours!r} now")
+            print("   Re-run with the same options or record a new baseline.\n")
+            return 2
+
+    print(f"\n⏱️  File Organizer v{organizer.__version__} benchmarks\n")
+    results = run_benchmarks(args)
+    if log_dir is not None:
+        organizer.stop_logging()
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+    report = {
+        "version": organizer.__version__,
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": workload_params(args),
+        "results": results
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
+        print(f"\n📝 Results written to {args.output}")
+
+    if args.baseline:
+        print(f"\n📊 Compared to {args.baseline} (threshold {args.threshold:.0%}):")
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ Regressions: {', '.join(regressions)}\n")
+            return 1
+        print("\n✓ No regressions\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
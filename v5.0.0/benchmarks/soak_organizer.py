@@ -0,0 +1,346 @@
+"""
+End-to-end event-storm soak harness for File Organizer v5.0.0
+
+Drives the real pipeline (watchdog Observer -> pending_files ->
+check_pending_files -> move) on a temp directory while a load generator
+drops files into the watched folder, then reports:
+
+    - create-to-organized latency (p50/p95/p99/max)
+    - peak Python heap (tracemalloc) and peak RSS
+    - peak thread count, CPU time and idle CPU use
+    - files that were never organized (dropped/missed)
+
+Arrival patterns:
+    steady   files arrive evenly at --rate files per minute
+    burst    --burst-size files at once, spaced to average --rate
+    chunked  like steady, but each file is written in --chunks pieces
+             --chunk-interval apart (many on_modified events per file)
+
+Usage:
+    python benchmarks/soak_organizer.py --pattern burst --rate 10000 --duration 60
+    python benchmarks/soak_organizer.py --pattern chunked --adaptive --output soak.json
+    python benchmarks/soak_organizer.py --runtime asyncio --pattern burst
+    python benchmarks/soak_organizer.py --watch-mode poll --pattern chunked
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import threading
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import file_organizer_v5 as organizer
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Instrumented Handler
+class TimedHandler(organizer.AdvancedFileOrganizerHandler):
+    """Handler that records when each file reached its destination"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.organized_at = {}
+        self._timing_lock = threading.Lock()
+
+    def move_file(self, source_file, dest_file, source_stat=None, kind="move"):
+        super().move_file(source_file, dest_file, source_stat, kind=kind)
+        with self._timing_lock:
+            self.organized_at[os.path.basename(source_file)] = time.monotonic()
+
+# Load Generator
+class LoadGenerator:
+    """Write files into a folder following an arrival pattern"""
+
+    def __init__(self, folder, pattern, rate_per_minute, duration, file_size,
+                 burst_size, chunks, chunk_interval):
+        self.folder = folder
+        self.pattern = pattern
+        self.interval = 60.0 / max(1, rate_per_minute)
+        self.duration = duration
+        self.file_size = file_size
+        self.burst_size = max(1, burst_size)
+        self.chunks = max(1, chunks)
+        self.chunk_interval = chunk_interval
+        self.created_at = {}
+        self._lock = threading.Lock()
+        self._payload = os.urandom(max(1, file_size))
+
+    def _write(self, name):
+        path = os.path.join(self.folder, name)
+        with self._lock:
+            self.created_at[name] = time.monotonic()
+        if self.pattern == "chunked":
+            piece = max(1, len(self._payload) // self.chunks)
+            with open(path, "wb") as f:
+                for offset in range(0, len(self._payload), piece):
+                    f.write(self._payload[offset:offset + piece])
+                    f.flush()
+                    time.sleep(self.chunk_interval)
+        else:
+            with open(path, "wb") as f:
+                f.write(self._payload)
+
+    def run(self):
+        """Generate files until the duration elapses"""
+        start = time.monotonic()
+        count = 0
+        # Chunked writers overlap, so they need their own threads
+        with ThreadPoolExecutor(max_workers=64, thread_name_prefix="loadgen") as writers:
+            while time.monotonic() - start < self.duration:
+                batch = self.burst_size if self.pattern == "burst" else 1
+                for _ in range(batch):
+                    name = f"soak_{count:08d}.txt"
+                    count += 1
+                    if self.pattern == "chunked":
+                        writers.submit(self._write, name)
+                    else:
+                        self._write(name)
+                next_at = start + count * self.interval
+                delay = next_at - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+        return count
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return None
+    rank = max(0, min(len(values) - 1, int(round(pct / 100.0 * len(values) + 0.5)) - 1))
+    return values[rank]
+
+def peak_rss_mb():
+    """Peak resident set size of this process"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return peak / (1048576 if sys.platform == "darwin" else 1024)
+
+def run_soak(args):
+    """Run one soak scenario and return the report"""
+    root = tempfile.mkdtemp(prefix="soak-")
+    source = os.path.join(root, "source")
+    dest_drive = os.path.join(root, "dest") + os.sep
+    os.makedirs(source)
+    os.makedirs(dest_drive)
+
+    settings = {
+        "general": {"delay_minutes": args.delay_seconds / 60.0},
+        "runtime": {"mode": args.runtime},
+        "pending": {
+            "high_water_mark": args.high_water,
+            "low_water_mark": args.high_water // 10,
+            "rescan_interval_seconds": args.rescan_interval
+        },
+        "events": {"shared_observer": args.shared_observer},
+        "polling": {"interval_seconds": args.poll_interval},
+        "readiness": {
+            "adaptive": args.adaptive,
+            "probe_interval_seconds": args.probe_interval,
+            "min_age_seconds": 0,
+            "category_min_age_seconds": {}
+        },
+        "statistics": {"stats_file": os.path.join(root, "statistics.json")},
+        "index": {"index_file": os.path.join(root, "content_index.db")}
+    }
+    config_file = os.path.join(root, "config.json")
+    with open(config_file, "w", encoding="utf-8") as f:
+        json.dump(settings, f)
+    config = organizer.ConfigManager(config_file)
+
+    statistics = organizer.StatisticsTracker(settings["statistics"]["stats_file"])
+    index = organizer.ContentIndex(settings["index"]["index_file"])
+    wakeup = threading.Event()
+    source_config = {
+        "name": "Soak",
+        "folder": source,
+        "destination_drive": dest_drive,
+        "destination_folder": "IN_MSG",
+        "enabled": True,
+        "watch_mode": args.watch_mode
+    }
+    handler = TimedHandler(source_config, config, statistics, index, wakeup)
+
+    observer = None
+    runtime = None
+    if args.runtime == "asyncio":
+        runtime = organizer.AsyncRuntime.from_settings([handler], config.settings)
+    elif args.shared_observer:
+        observer = organizer.EventDispatcher(
+            workers=config.settings["events"]["dispatch_workers"],
+            poller=organizer.SnapshotObserver.from_settings(config.settings)
+        )
+        observer.add(handler)
+    elif handler.polling:
+        observer = organizer.SnapshotObserver.from_settings(config.settings)
+        observer.schedule(handler, source)
+    else:
+        observer = organizer.Observer()
+        observer.schedule(handler, source, recursive=False)
+
+    tracemalloc.start()
+    cpu_start = time.process_time()
+    stop_event = threading.Event()
+    if runtime is not None:
+        loop = threading.Thread(target=runtime.run, args=(False,), name="asyncio-runtime")
+        loop.start()
+        while runtime.loop is None:
+            time.sleep(0.01)
+        time.sleep(0.2)  # let the observer start
+    else:
+        observer.start()
+        loop = threading.Thread(
+            target=organizer.run_pending_loop,
+            args=([handler], wakeup, 1.0, stop_event),
+            name="pending-loop"
+        )
+        loop.start()
+
+    # Sample thread count while the storm runs
+    peak_threads = threading.active_count()
+    sampling = threading.Event()
+
+    def sample_threads():
+        nonlocal peak_threads
+        while not sampling.wait(0.1):
+            peak_threads = max(peak_threads, threading.active_count())
+
+    sampler = threading.Thread(target=sample_threads, name="sampler", daemon=True)
+    sampler.start()
+
+    generator = LoadGenerator(
+        source, args.pattern, args.rate, args.duration, args.file_size,
+        args.burst_size, args.chunks, args.chunk_interval
+    )
+    started = time.monotonic()
+    created = generator.run()
+
+    # Let the pipeline drain
+    drain_deadline = time.monotonic() + args.delay_seconds + args.drain_seconds
+    while time.monotonic() < drain_deadline and len(handler.organized_at) < created:
+        time.sleep(0.1)
+    elapsed = time.monotonic() - started
+
+    # Idle cost: CPU used while nothing is arriving or pending
+    idle_cpu_start = time.process_time()
+    time.sleep(args.idle_seconds)
+    idle_cpu = time.process_time() - idle_cpu_start
+
+    sampling.set()
+    cpu_seconds = time.process_time() - cpu_start
+    if runtime is not None:
+        runtime.stop()
+        loop.join()
+    else:
+        stop_event.set()
+        wakeup.set()
+        loop.join()
+        observer.stop()
+        observer.join()
+    _, peak_heap = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    statistics.close()
+    index.close()
+
+    latencies = sorted(
+        done - generator.created_at[name]
+        for name, done in handler.organized_at.items()
+        if name in generator.created_at
+    )
+    missed = sorted(set(generator.created_at) - set(handler.organized_at))
+    report = {
+        "version": organizer.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": vars(args),
+        "files_created": created,
+        "files_organized": len(handler.organized_at),
+        "files_missed": len(missed),
+        "missed_sample": missed[:10],
+        "elapsed_seconds": elapsed,
+        "latency_seconds": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1] if latencies else None
+        },
+        "peak_python_heap_mb": peak_heap / 1048576,
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_threads": peak_threads,
+        "cpu_seconds": cpu_seconds,
+        "idle_cpu_percent": idle_cpu / args.idle_seconds * 100 if args.idle_seconds else None,
+        "pending_after_drain": len(handler.pending_files),
+        "rescan_mode_after_drain": handler.rescan_mode
+    }
+    if args.shared_observer:
+        report["dispatcher"] = observer.metrics()
+
+    shutil.rmtree(root, ignore_errors=True)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="File Organizer event-storm soak harness")
+    parser.add_argument("--pattern", choices=["steady", "burst", "chunked"], default="steady")
+    parser.add_argument("--rate", type=int, default=10000, help="files per minute")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of load")
+    parser.add_argument("--file-size", type=int, default=4096, help="bytes per file")
+    parser.add_argument("--burst-size", type=int, default=500, help="files per burst")
+    parser.add_argument("--chunks", type=int, default=20, help="writes per file (chunked)")
+    parser.add_argument("--chunk-interval", type=float, default=0.05, help="seconds between chunks")
+    parser.add_argument("--delay-seconds", type=float, default=2.0, help="organizer delay")
+    parser.add_argument("--drain-seconds", type=float, default=30.0, help="extra time to drain")
+    parser.add_argument("--adaptive", action="store_true", help="enable adaptive readiness")
+    parser.add_argument("--probe-interval", type=float, default=0.5, help="adaptive probe interval")
+    parser.add_argument("--shared-observer", action="store_true", help="use the shared dispatcher")
+    parser.add_argument("--runtime", choices=["threads", "asyncio"], default="threads")
+    parser.add_argument("--watch-mode", choices=["watch", "poll"], default="watch",
+                        help="native events or the snapshot poller")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="seconds between polls")
+    parser.add_argument("--high-water", type=int, default=100000, help="pending files before rescan mode")
+    parser.add_argument("--rescan-interval", type=float, default=5.0, help="seconds between rescans")
+    parser.add_argument("--idle-seconds", type=float, default=5.0, help="idle period measured for CPU use")
+    parser.add_argument("--output", help="write the report JSON to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    print(f"\n🌪️  Soak: {args.pattern}, {args.rate:,} files/min for {args.duration:.0f}s "
+          f"(delay {args.delay_seconds}s, {args.runtime} runtime)\n")
+    report = run_soak(args)
+
+    lat = report["latency_seconds"]
+    fmt = lambda v: "n/a" if v is None else f"{v:.3f}s"
+    print(f"   Files created:    {report['files_created']:,}")
+    print(f"   Files organized:  {report['files_organized']:,}")
+    print(f"   Files missed:     {report['files_missed']:,}")
+    print(f"   Latency p50/p95/p99/max: {fmt(lat['p50'])} / {fmt(lat['p95'])} / "
+          f"{fmt(lat['p99'])} / {fmt(lat['max'])}")
+    print(f"   Peak heap:        {report['peak_python_heap_mb']:.1f} MB")
+    if report["peak_rss_mb"] is not None:
+        print(f"   Peak RSS:         {report['peak_rss_mb']:.1f} MB")
+    print(f"   Peak threads:     {report['peak_threads']}")
+    print(f"   CPU time:         {report['cpu_seconds']:.2f}s")
+    if report["idle_cpu_percent"] is not None:
+        print(f"   Idle CPU:         {report['idle_cpu_percent']:.2f}%")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
+        print(f"\n📝 Report written to {args.output}")
+    print()
+    return 1 if report["files_missed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
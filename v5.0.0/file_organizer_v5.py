@@ -20,12 +20,36 @@ import shutil
 import time
 import json
 import logging
+import logging.handlers
 from pathlib import Path
 from datetime import datetime
+from collections import OrderedDict
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+from watchdog.events import (
+    FileSystemEventHandler, FileCreatedEvent, FileModifiedEvent, FileDeletedEvent
+)
 import hashlib
 import sys
+import stat
+import re
+import fnmatch
+import threading
+import tempfile
+import signal
+import atexit
+import sqlite3
+import heapq
+import mmap
+import multiprocessing
+import math
+import queue
+import bisect
+import array
+import argparse
+import asyncio
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 __version__ = "5.0.0"
 
@@ -36,20 +60,56 @@ class ConfigManager:
         self.config_file = config_file
         self.settings = self.load_or_create_config()
     
-    def load_or_create_config(self):
-        """Load existing config or create default"""
-        default_config = {
+    def default_settings(self):
+        """Built-in defaults that config.json is merged onto"""
+        return {
             "version": "5.0.0",
             "general": {
                 "delay_minutes": 30,
                 "organize_existing_on_startup": False,
-                "check_interval_seconds": 10
+                "check_interval_seconds": 10,
+                "bucket_by": "now",
+                "reload_on_change": True
+            },
+            "readiness": {
+                "adaptive": False,
+                "probe_interval_seconds": 5,
+                "stable_probes": 2,
+                "min_age_seconds": 10,
+                "category_min_age_seconds": {
+                    "videos": 60,
+                    "archives": 30
+                },
+                "require_exclusive_open": True
+            },
+            "events": {
+                "shared_observer": False,
+                "dispatch_workers": 2,
+                "coalesce_window_seconds": 1,
+                "log_summary_interval_seconds": 60
+            },
+            "pending": {
+                "high_water_mark": 100000,
+                "low_water_mark": 10000,
+                "rescan_interval_seconds": 60
+            },
+            "runtime": {
+                "mode": "threads",
+                "max_workers": 4,
+                "max_in_flight": 16
             },
             "logging": {
                 "log_to_file": True,
                 "log_file": "file_organizer.log",
                 "log_level": "INFO",
-                "console_output": True
+                "console_output": True,
+                "format": "text",
+                "max_bytes": 0,
+                "backup_count": 5,
+                "queue": False,
+                "queue_size": 10000,
+                "queue_full_policy": "drop",
+                "flush_interval_seconds": 0.1
             },
             "sources": [
                 {
@@ -82,12 +142,68 @@ class ConfigManager:
             "exclusions": {
                 "exclude_prefixes": [".", "~", "$"],
                 "exclude_files": ["desktop.ini", "Thumbs.db", ".DS_Store"],
-                "exclude_extensions": [".tmp", ".temp", ".crdownload", ".part"]
+                "exclude_extensions": [".tmp", ".temp", ".crdownload", ".part"],
+                "exclude_patterns": [],
+                "exclude_regex": [],
+                "exclude_dirs": []
+            },
+            "polling": {
+                "interval_seconds": 10,
+                "full_scan_every": 30,
+                "network_fs_types": ["nfs", "nfs4", "cifs", "smb3", "smbfs", "afs", "9p",
+                                     "davfs", "fuse.sshfs", "fuse.rclone"]
+            },
+            "classifier": {
+                "sniff_content": False,
+                "max_header_bytes": 4096,
+                "cache_entries": 10000
+            },
+            "bulk": {
+                "parallel": False,
+                "workers_per_device": 4,
+                "device_workers": {}
+            },
+            "moves": {
+                "buffer_size_kb": 1024,
+                "verify_copy": False
+            },
+            "duplicates": {
+                "hash_algorithm": "blake2b",
+                "buffer_size_kb": 1024,
+                "sample_block_kb": 64,
+                "sample_blocks": 4
+            },
+            "hashing": {
+                "process_pool": True,
+                "pool_threshold_mb": 64,
+                "workers": 0,
+                "tree_threshold_mb": 0,
+                "tree_chunk_mb": 16,
+                "cache_entries": 10000
+            },
+            "index": {
+                "enabled": True,
+                "index_file": "content_index.db",
+                "dedupe_across_folders": False
+            },
+            "journal": {
+                "enabled": True,
+                "journal_file": "move_journal.jsonl",
+                "fsync_every": 64,
+                "fsync_interval_seconds": 1,
+                "retention_days": 30
+            },
+            "metrics": {
+                "enabled": False,
+                "http_port": 0,
+                "summary_interval_seconds": 60
             },
             "statistics": {
                 "enabled": True,
                 "stats_file": "statistics.json",
-                "show_on_exit": True
+                "show_on_exit": True,
+                "flush_interval_seconds": 30,
+                "flush_every": 500
             },
             "notifications": {
                 "enabled": False,
@@ -95,6 +211,14 @@ class ConfigManager:
                 "show_error_notification": True
             }
         }
+    
+    def load_or_create_config(self):
+        """Load existing config or create default
+        
+        Raises ValueError if the merged config fails validate_settings,
+        with the same messages a reload reports.
+        """
+        default_config = self.default_settings()
         
         if os.path.exists(self.config_file):
             try:
@@ -102,17 +226,45 @@ class ConfigManager:
                     loaded = json.load(f)
                     # Deep merge
                     self._deep_merge(default_config, loaded)
-                    return default_config
             except Exception as e:
                 print(f"⚠️  Error loading config: {e}")
                 print("   Using default configuration.")
                 self.save_config(default_config)
                 return default_config
+            problems = validate_settings(default_config)
+            if problems:
+                raise ValueError("; ".join(problems))
+            return default_config
         else:
             print(f"📝 Creating default config file: {self.config_file}")
             self.save_config(default_config)
             return default_config
     
+    def read_config(self):
+        """Read, merge and validate config.json without applying it
+        
+        Raises ValueError describing every problem found.
+        """
+        try:
+            with open(self.config_file, 'r', encoding='utf-8') as f:
+                loaded = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ValueError(f"cannot read {self.config_file}: {e}")
+        if not isinstance(loaded, dict):
+            raise ValueError(f"{self.config_file} must contain a JSON object")
+        
+        settings = self.default_settings()
+        self._deep_merge(settings, loaded)
+        problems = validate_settings(settings)
+        if problems:
+            raise ValueError("; ".join(problems))
+        return settings
+    
+    def reload(self):
+        """Replace the settings with a freshly validated config.json"""
+        self.settings = self.read_config()
+        return self.settings
+    
     def _deep_merge(self, base, update):
         """Recursively merge dictionaries"""
         for key, value in update.items():
@@ -131,13 +283,185 @@ class ConfigManager:
         except Exception as e:
             print(f"❌ Error saving config: {e}")
 
+def validate_settings(settings):
+    """Return a list of problems with a merged configuration"""
+    problems = []
+    
+    def is_number(value):
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    
+    def is_int(value):
+        return isinstance(value, int) and not isinstance(value, bool)
+    
+    general = settings.get("general", {})
+    if not is_number(general.get("delay_minutes")) or general["delay_minutes"] < 0:
+        problems.append("general.delay_minutes must be a number >= 0")
+    if not is_number(general.get("check_interval_seconds")) or general["check_interval_seconds"] <= 0:
+        problems.append("general.check_interval_seconds must be a number > 0")
+    if general.get("bucket_by") not in ("now", "mtime"):
+        problems.append('general.bucket_by must be "now" or "mtime"')
+    
+    sources = settings.get("sources")
+    if not isinstance(sources, list):
+        problems.append("sources must be a list")
+        sources = []
+    names = set()
+    for i, source in enumerate(sources):
+        if not isinstance(source, dict):
+            problems.append(f"sources[{i}] must be an object")
+            continue
+        for key in ("name", "folder", "destination_drive", "destination_folder"):
+            if not isinstance(source.get(key), str):
+                problems.append(f"sources[{i}].{key} must be a string")
+        if source.get("watch_mode", "auto") not in ("watch", "poll", "auto"):
+            problems.append(f'sources[{i}].watch_mode must be "watch", "poll" or "auto"')
+        if source.get("name") in names:
+            problems.append(f"duplicate source name {source.get('name')!r}")
+        names.add(source.get("name"))
+    
+    file_types = settings.get("file_types")
+    if not isinstance(file_types, dict) or not all(
+            isinstance(exts, list) and all(isinstance(e, str) for e in exts)
+            for exts in file_types.values()):
+        problems.append("file_types must map categories to lists of extensions")
+    
+    exclusions = settings.get("exclusions")
+    if not isinstance(exclusions, dict) or not all(
+            isinstance(values, list) and all(isinstance(v, str) for v in values)
+            for values in exclusions.values()):
+        problems.append("exclusions must map rule names to lists of strings")
+    
+    hashing = settings.get("hashing", {})
+    for key in ("pool_threshold_mb", "tree_chunk_mb", "cache_entries"):
+        if not is_number(hashing.get(key, 1)) or hashing.get(key, 1) <= 0:
+            problems.append(f"hashing.{key} must be a number > 0")
+    for key in ("workers", "tree_threshold_mb"):
+        if not is_number(hashing.get(key, 0)) or hashing.get(key, 0) < 0:
+            problems.append(f"hashing.{key} must be a number >= 0")
+    
+    polling = settings.get("polling", {})
+    if not is_number(polling.get("interval_seconds", 10)) or polling.get("interval_seconds", 10) <= 0:
+        problems.append("polling.interval_seconds must be a number > 0")
+    if not is_number(polling.get("full_scan_every", 30)) or polling.get("full_scan_every", 30) < 0:
+        problems.append("polling.full_scan_every must be a number >= 0")
+    
+    classifier = settings.get("classifier", {})
+    for key in ("max_header_bytes", "cache_entries"):
+        if not is_number(classifier.get(key, 1)) or classifier.get(key, 1) <= 0:
+            problems.append(f"classifier.{key} must be a number > 0")
+    
+    readiness = settings.get("readiness", {})
+    for key in ("adaptive", "require_exclusive_open"):
+        if not isinstance(readiness.get(key, False), bool):
+            problems.append(f"readiness.{key} must be true or false")
+    if not is_number(readiness.get("probe_interval_seconds", 5)) or readiness.get("probe_interval_seconds", 5) <= 0:
+        problems.append("readiness.probe_interval_seconds must be a number > 0")
+    if not is_int(readiness.get("stable_probes", 2)) or readiness.get("stable_probes", 2) < 1:
+        problems.append("readiness.stable_probes must be a whole number >= 1")
+    if not is_number(readiness.get("min_age_seconds", 10)) or readiness.get("min_age_seconds", 10) < 0:
+        problems.append("readiness.min_age_seconds must be a number >= 0")
+    category_ages = readiness.get("category_min_age_seconds", {})
+    if not isinstance(category_ages, dict) or not all(
+            is_number(age) and age >= 0 for age in category_ages.values()):
+        problems.append("readiness.category_min_age_seconds must map categories to numbers >= 0")
+    
+    events = settings.get("events", {})
+    if not isinstance(events.get("shared_observer", False), bool):
+        problems.append("events.shared_observer must be true or false")
+    if not is_int(events.get("dispatch_workers", 2)) or events.get("dispatch_workers", 2) < 1:
+        problems.append("events.dispatch_workers must be a whole number >= 1")
+    for key in ("coalesce_window_seconds", "log_summary_interval_seconds"):
+        if not is_number(events.get(key, 0)) or events.get(key, 0) < 0:
+            problems.append(f"events.{key} must be a number >= 0")
+    
+    pending = settings.get("pending", {})
+    high = pending.get("high_water_mark", 100000)
+    low = pending.get("low_water_mark", 10000)
+    if not is_int(high) or high < 1:
+        problems.append("pending.high_water_mark must be a whole number >= 1")
+    elif not is_int(low) or not 0 <= low <= high:
+        problems.append("pending.low_water_mark must be a whole number >= 0 and not above high_water_mark")
+    if not is_number(pending.get("rescan_interval_seconds", 60)) or pending.get("rescan_interval_seconds", 60) <= 0:
+        problems.append("pending.rescan_interval_seconds must be a number > 0")
+    
+    duplicates = settings.get("duplicates", {})
+    try:
+        hashlib.new(duplicates.get("hash_algorithm", "blake2b"))
+    except (ValueError, TypeError):
+        problems.append(f"duplicates.hash_algorithm {duplicates.get('hash_algorithm')!r} is not available")
+    for key in ("buffer_size_kb", "sample_block_kb", "sample_blocks"):
+        if not is_int(duplicates.get(key, 1)) or duplicates.get(key, 1) <= 0:
+            problems.append(f"duplicates.{key} must be a whole number > 0")
+    
+    moves = settings.get("moves", {})
+    if not is_int(moves.get("buffer_size_kb", 1024)) or moves.get("buffer_size_kb", 1024) <= 0:
+        problems.append("moves.buffer_size_kb must be a whole number > 0")
+    if not isinstance(moves.get("verify_copy", False), bool):
+        problems.append("moves.verify_copy must be true or false")
+    
+    bulk = settings.get("bulk", {})
+    if not isinstance(bulk.get("parallel", False), bool):
+        problems.append("bulk.parallel must be true or false")
+    if not is_int(bulk.get("workers_per_device", 4)) or bulk.get("workers_per_device", 4) < 1:
+        problems.append("bulk.workers_per_device must be a whole number >= 1")
+    device_workers = bulk.get("device_workers", {})
+    if not isinstance(device_workers, dict) or not all(
+            is_int(workers) and workers >= 1 for workers in device_workers.values()):
+        problems.append("bulk.device_workers must map drives to whole numbers >= 1")
+    
+    log_config = settings.get("logging", {})
+    for key in ("log_to_file", "console_output", "queue"):
+        if not isinstance(log_config.get(key, False), bool):
+            problems.append(f"logging.{key} must be true or false")
+    if not isinstance(log_config.get("log_file", ""), str):
+        problems.append("logging.log_file must be a string")
+    if not isinstance(logging.getLevelName(str(log_config.get("log_level", "INFO"))), int):
+        problems.append("logging.log_level must be DEBUG, INFO, WARNING, ERROR or CRITICAL")
+    if log_config.get("format", "text") not in ("text", "json"):
+        problems.append('logging.format must be "text" or "json"')
+    if log_config.get("queue_full_policy", "drop") not in ("drop", "block"):
+        problems.append('logging.queue_full_policy must be "drop" or "block"')
+    for key in ("max_bytes", "backup_count", "queue_size"):
+        if not is_int(log_config.get(key, 0)) or log_config.get(key, 0) < 0:
+            problems.append(f"logging.{key} must be a whole number >= 0")
+    if not is_number(log_config.get("flush_interval_seconds", 0.1)) or log_config.get("flush_interval_seconds", 0.1) <= 0:
+        problems.append("logging.flush_interval_seconds must be a number > 0")
+    
+    if not problems:
+        try:
+            CompiledRules.from_settings(settings)
+        except re.error as e:
+            problems.append(f"invalid exclusion pattern: {e}")
+    return problems
+
 # Statistics Tracker
 class StatisticsTracker:
     """Track and manage file organization statistics"""
-    def __init__(self, stats_file="statistics.json", enabled=True):
+    def __init__(self, stats_file="statistics.json", enabled=True,
+                 flush_interval_seconds=30, flush_every=500):
         self.stats_file = stats_file
         self.enabled = enabled
+        self.flush_interval = flush_interval_seconds
+        self.flush_every = flush_every
         self.stats = self.load_stats()
+        
+        # Write-behind state
+        self._lock = threading.RLock()
+        self._dirty = 0
+        self._write_lock = threading.Lock()
+        self._generation = 0
+        self._written_generation = 0
+        # mkstemp creates 0600 files; a new statistics file gets the usual umask mode
+        umask = os.umask(0)
+        os.umask(umask)
+        self._new_file_mode = 0o666 & ~umask
+        self._stop_event = threading.Event()
+        self._flusher = None
+        if self.enabled and self.flush_interval and self.flush_interval > 0:
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="stats-flusher", daemon=True
+            )
+            self._flusher.start()
     
     def load_stats(self):
         """Load statistics from file"""
@@ -153,6 +477,7 @@ class StatisticsTracker:
             },
             "by_type": {},
             "by_date": {},
+            "duplicate_checks": {"size": 0, "sample": 0, "full": 0},
             "sessions": []
         }
         
@@ -162,49 +487,115 @@ class StatisticsTracker:
                     loaded = json.load(f)
                     # Keep history, just update session_start
                     loaded["session_start"] = datetime.now().isoformat()
+                    loaded.setdefault("duplicate_checks", default_stats["duplicate_checks"])
                     return loaded
             except:
                 return default_stats
         return default_stats
     
-    def save_stats(self):
-        """Save statistics to file"""
+    def _flush_loop(self):
+        """Background flush on the configured interval"""
+        while not self._stop_event.wait(self.flush_interval):
+            if self._dirty:
+                self.flush()
+    
+    def flush(self):
+        """Write statistics atomically (temp file + rename)"""
         if not self.enabled:
             return
         
-        try:
-            self.stats["last_updated"] = datetime.now().isoformat()
-            with open(self.stats_file, 'w', encoding='utf-8') as f:
-                json.dump(self.stats, f, indent=4, ensure_ascii=False)
-        except Exception as e:
-            logging.error(f"Error saving statistics: {e}")
+        with _METRICS.timer("stats_persist"):
+            with self._lock:
+                self.stats["last_updated"] = datetime.now().isoformat()
+                payload = json.dumps(self.stats, indent=4, ensure_ascii=False)
+                self._dirty = 0
+                self._generation += 1
+                generation = self._generation
+            
+            # Writers are serialized, and a snapshot older than the one on disk is dropped
+            with self._write_lock:
+                if generation <= self._written_generation:
+                    return
+                stats_dir = os.path.dirname(os.path.abspath(self.stats_file))
+                tmp_path = None
+                try:
+                    fd, tmp_path = tempfile.mkstemp(
+                        prefix=".stats-", suffix=".tmp", dir=stats_dir
+                    )
+                    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                        f.write(payload)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    try:
+                        mode = stat.S_IMODE(os.stat(self.stats_file).st_mode)
+                    except OSError:
+                        mode = self._new_file_mode
+                    os.chmod(tmp_path, mode)
+                    os.replace(tmp_path, self.stats_file)
+                    self._written_generation = generation
+                except Exception as e:
+                    logging.error(f"Error saving statistics: {e}")
+                    with self._lock:
+                        self._dirty += 1  # retried by the next flush or close()
+                    if tmp_path and os.path.exists(tmp_path):
+                        try:
+                            os.remove(tmp_path)
+                        except OSError:
+                            pass
+    
+    def save_stats(self):
+        """Save statistics to file"""
+        self.flush()
+    
+    def close(self):
+        """Stop the background flusher and write any pending changes"""
+        self._stop_event.set()
+        if self._flusher is not None and self._flusher is not threading.current_thread():
+            self._flusher.join(timeout=5)
+        if self._dirty:
+            self.flush()
     
     def increment(self, action, file_type=None):
         """Increment a statistic"""
         if not self.enabled:
             return
         
-        # Update totals
-        if action in self.stats["totals"]:
-            self.stats["totals"][action] += 1
-        
-        # Update by file type
-        if file_type:
-            if file_type not in self.stats["by_type"]:
-                self.stats["by_type"][file_type] = 0
-            self.stats["by_type"][file_type] += 1
-        
-        # Update by date
-        today = datetime.now().strftime("%Y-%m-%d")
-        if today not in self.stats["by_date"]:
-            self.stats["by_date"][today] = {"files_moved": 0, "errors": 0}
+        with self._lock:
+            # Update totals
+            if action in self.stats["totals"]:
+                self.stats["totals"][action] += 1
+            
+            # Update by file type
+            if file_type:
+                if file_type not in self.stats["by_type"]:
+                    self.stats["by_type"][file_type] = 0
+                self.stats["by_type"][file_type] += 1
+            
+            # Update by date
+            today = datetime.now().strftime("%Y-%m-%d")
+            if today not in self.stats["by_date"]:
+                self.stats["by_date"][today] = {"files_moved": 0, "errors": 0}
+            
+            if action == "files_moved":
+                self.stats["by_date"][today]["files_moved"] += 1
+            elif action == "errors":
+                self.stats["by_date"][today]["errors"] += 1
+            
+            self._dirty += 1
+            flush_now = self.flush_every and self._dirty >= self.flush_every
         
-        if action == "files_moved":
-            self.stats["by_date"][today]["files_moved"] += 1
-        elif action == "errors":
-            self.stats["by_date"][today]["errors"] += 1
+        if flush_now:
+            self.flush()
+    
+    def record_duplicate_check(self, tier):
+        """Count a duplicate comparison resolved by the given tier"""
+        if not self.enabled:
+            return
         
-        self.save_stats()
+        with self._lock:
+            checks = self.stats["duplicate_checks"]
+            checks[tier] = checks.get(tier, 0) + 1
+            self._dirty += 1
     
     def get_summary(self):
         """Get statistics summary"""
@@ -230,6 +621,13 @@ class StatisticsTracker:
             for file_type, count in sorted_types[:10]:  # Top 10
                 print(f"   {file_type:15} {count:,}")
         
+        checks = self.stats.get("duplicate_checks", {})
+        if any(checks.values()):
+            print(f"\n🔍 Duplicate Checks Resolved By:")
+            print(f"   Size:        {checks.get('size', 0):,}")
+            print(f"   Sampled:     {checks.get('sample', 0):,}")
+            print(f"   Full Hash:   {checks.get('full', 0):,}")
+        
         if self.stats["by_date"]:
             print(f"\n📅 Recent Activity:")
             recent_dates = sorted(self.stats["by_date"].items(), reverse=True)[:7]  # Last 7 days
@@ -238,287 +636,3817 @@ class StatisticsTracker:
         
         print("\n" + "=" * 80 + "\n")
 
-# Advanced File Organizer Handler
-class AdvancedFileOrganizerHandler(FileSystemEventHandler):
-    """Advanced file organization with v5.0.0 features"""
+# Stage Metrics
+class _StageTimer:
+    """Context manager that records elapsed time for one stage"""
+    __slots__ = ("metrics", "stage", "start")
     
-    def __init__(self, source_config, config_manager, statistics):
-        self.source_config = source_config
-        self.config = config_manager
-        self.stats = statistics
-        
-        # Source and destination
-        self.source_folder = str(Path.home() / source_config["folder"])
-        self.dest_base = source_config["destination_drive"]
-        self.dest_folder = source_config["destination_folder"]
-        self.name = source_config["name"]
-        
-        # Settings
-        self.delay_minutes = config_manager.settings["general"]["delay_minutes"]
-        self.file_types = config_manager.settings["file_types"]
-        self.exclusions = config_manager.settings["exclusions"]
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+class _NullTimer:
+    """Shared no-op timer used while metrics are disabled"""
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+class NullMetrics:
+    """Metrics sink that records nothing"""
+    enabled = False
+    _TIMER = _NullTimer()
+    
+    def timer(self, stage):
+        return self._TIMER
+    
+    def observe(self, stage, seconds):
+        pass
+
+class StageMetrics:
+    """Per-stage timing histograms with Prometheus text export"""
+    
+    enabled = True
+    BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0, 120.0, 600.0)
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._collectors = []
+        self._server = None
+        self._summary_stop = threading.Event()
+    
+    def timer(self, stage):
+        """Time a block: with metrics.timer("hash"): ..."""
+        return _StageTimer(self, stage)
+    
+    def observe(self, stage, seconds):
+        """Record one duration for a stage"""
+        index = bisect.bisect_left(self.BUCKETS, seconds)
+        with self._lock:
+            data = self._stages.get(stage)
+            if data is None:
+                # [bucket counts (+Inf last), count, sum, max]
+                data = self._stages[stage] = [[0] * (len(self.BUCKETS) + 1), 0, 0.0, 0.0]
+            data[0][index] += 1
+            data[1] += 1
+            data[2] += seconds
+            if seconds > data[3]:
+                data[3] = seconds
+    
+    def add_collector(self, collector):
+        """Register a callable returning extra Prometheus lines"""
+        self._collectors.append(collector)
+    
+    def snapshot(self):
+        """Copy of the per-stage data"""
+        with self._lock:
+            return {stage: (list(d[0]), d[1], d[2], d[3]) for stage, d in self._stages.items()}
+    
+    def quantile(self, buckets, count, q):
+        """Upper bucket bound below which a share q of observations fall"""
+        target = q * count
+        seen = 0
+        for bound, n in zip(self.BUCKETS, buckets):
+            seen += n
+            if seen >= target:
+                return bound
+        return float("inf")
+    
+    def prometheus_text(self):
+        """Render all stages in Prometheus text exposition format"""
+        lines = [
+            "# HELP organizer_stage_seconds Time spent in each pipeline stage",
+            "# TYPE organizer_stage_seconds histogram"
+        ]
+        for stage, (buckets, count, total, _) in sorted(self.snapshot().items()):
+            cumulative = 0
+            for bound, n in zip(self.BUCKETS, buckets):
+                cumulative += n
+                lines.append(f'organizer_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'organizer_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {count}')
+            lines.append(f'organizer_stage_seconds_sum{{stage="{stage}"}} {total}')
+            lines.append(f'organizer_stage_seconds_count{{stage="{stage}"}} {count}')
+        for collector in self._collectors:
+            try:
+                lines.extend(collector())
+            except Exception as e:
+                logging.getLogger(__name__).debug(f"Metrics collector failed: {e}")
+        return "\n".join(lines) + "\n"
+    
+    def summary_line(self):
+        """One-line per-stage summary for the log"""
+        parts = []
+        for stage, (buckets, count, total, peak) in sorted(self.snapshot().items()):
+            if not count:
+                continue
+            p95 = self.quantile(buckets, count, 0.95)
+            parts.append(f"{stage} n={count} avg={total / count * 1000:.2f}ms "
+                         f"p95<={p95 * 1000:.1f}ms max={peak * 1000:.1f}ms")
+        return "📈 " + (" | ".join(parts) if parts else "no activity")
+    
+    def start_server(self, port, host="127.0.0.1"):
+        """Serve /metrics on a local HTTP port from a daemon thread"""
+        metrics = self
         
-        # Pending files queue
-        self.pending_files = {}
+        class MetricsRequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
         
-        # Logger
-        self.logger = logging.getLogger(__name__)
+        self._server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+        threading.Thread(
+            target=self._server.serve_forever, name="metrics-http", daemon=True
+        ).start()
     
-    def get_file_hash(self, filepath):
-        """Calculate MD5 hash for duplicate detection"""
-        hash_md5 = hashlib.md5()
-        try:
-            with open(filepath, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_md5.update(chunk)
-            return hash_md5.hexdigest()
-        except Exception as e:
-            self.logger.error(f"Hash calculation error: {e}")
-            return None
+    def start_summary(self, interval, logger):
+        """Log a summary line every interval seconds from a daemon thread"""
+        def loop():
+            while not self._summary_stop.wait(interval):
+                logger.info(self.summary_line())
+        threading.Thread(target=loop, name="metrics-summary", daemon=True).start()
     
-    def get_file_type_category(self, file_ext):
-        """Get file type category"""
-        for category, extensions in self.file_types.items():
-            if file_ext in extensions:
-                return category
-        return "others"
+    def stop(self):
+        """Stop the HTTP server and the summary thread"""
+        self._summary_stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+_METRICS = NullMetrics()
+
+def enable_metrics():
+    """Switch stage timing on and return the active metrics object"""
+    global _METRICS
+    if not _METRICS.enabled:
+        _METRICS = StageMetrics()
+    return _METRICS
+
+# Rule Compiler
+def _file_suffix(filename):
+    """Return the suffix of a file name, matching Path(filename).suffix"""
+    i = filename.rfind('.')
+    if 0 < i < len(filename) - 1:
+        return filename[i:]
+    return ""
+
+class CompiledRules:
+    """Immutable lookup snapshot built from file_types and exclusions"""
     
-    def get_destination_path(self, file_path):
-        """Generate organized destination path"""
-        now = datetime.now()
-        year = now.strftime("%Y")
-        month = now.strftime("%m_%B")
+    _TERMINAL = ""
+    
+    __slots__ = ("ext_to_category", "prefix_trie", "exclude_files",
+                 "exclude_extensions", "exclude_pattern", "exclude_dirs")
+    
+    def __init__(self, ext_to_category, prefix_trie, exclude_files,
+                 exclude_extensions, exclude_pattern, exclude_dirs=frozenset()):
+        object.__setattr__(self, "ext_to_category", ext_to_category)
+        object.__setattr__(self, "prefix_trie", prefix_trie)
+        object.__setattr__(self, "exclude_files", exclude_files)
+        object.__setattr__(self, "exclude_extensions", exclude_extensions)
+        object.__setattr__(self, "exclude_pattern", exclude_pattern)
+        object.__setattr__(self, "exclude_dirs", exclude_dirs)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("CompiledRules is immutable")
+    
+    @classmethod
+    def from_settings(cls, settings):
+        """Compile the file_types and exclusions sections of a config"""
+        file_types = settings.get("file_types", {})
+        exclusions = settings.get("exclusions", {})
         
-        file_ext = Path(file_path).suffix.lower()
-        type_category = self.get_file_type_category(file_ext)
+        # Extension -> category; the first category listing an extension wins
+        ext_to_category = {}
+        for category, extensions in file_types.items():
+            for ext in extensions:
+                ext_to_category.setdefault(ext.lower(), category)
         
-        dest_path = os.path.join(
-            self.dest_base,
-            self.dest_folder,
-            year,
-            month,
-            type_category
-        )
+        # Prefix trie of nested dicts, terminal nodes marked with ""
+        prefix_trie = {}
+        for prefix in exclusions.get("exclude_prefixes", []):
+            if not prefix:
+                continue
+            node = prefix_trie
+            for char in prefix:
+                node = node.setdefault(char, {})
+            node[cls._TERMINAL] = True
         
-        return dest_path, type_category
+        # Glob and regex rules merged into a single alternation
+        patterns = [fnmatch.translate(glob) for glob in exclusions.get("exclude_patterns", [])]
+        patterns.extend(exclusions.get("exclude_regex", []))
+        exclude_pattern = None
+        if patterns:
+            exclude_pattern = re.compile("|".join(f"(?:{p})" for p in patterns))
+        
+        return cls(
+            ext_to_category,
+            prefix_trie,
+            frozenset(exclusions.get("exclude_files", [])),
+            frozenset(ext.lower() for ext in exclusions.get("exclude_extensions", [])),
+            exclude_pattern,
+            frozenset(exclusions.get("exclude_dirs", []))
+        )
     
-    def should_exclude(self, filename):
-        """Check if file should be excluded"""
-        # Check prefixes
-        for prefix in self.exclusions["exclude_prefixes"]:
-            if filename.startswith(prefix):
+    def category_for(self, file_ext):
+        """Return the category for a lowercase extension"""
+        return self.ext_to_category.get(file_ext, "others")
+    
+    def has_excluded_prefix(self, filename):
+        """Walk the prefix trie along the file name"""
+        node = self.prefix_trie
+        for char in filename:
+            node = node.get(char)
+            if node is None:
+                return False
+            if self._TERMINAL in node:
                 return True
-        
-        # Check specific files
-        if filename in self.exclusions["exclude_files"]:
+        return False
+    
+    def is_excluded(self, filename):
+        """Check a file name against every exclusion rule"""
+        if self.prefix_trie and self.has_excluded_prefix(filename):
             return True
-        
-        # Check extensions
-        file_ext = Path(filename).suffix.lower()
-        if file_ext in self.exclusions["exclude_extensions"]:
+        if filename in self.exclude_files:
+            return True
+        if _file_suffix(filename).lower() in self.exclude_extensions:
+            return True
+        if self.exclude_pattern is not None and self.exclude_pattern.match(filename):
             return True
-        
         return False
     
-    def handle_duplicate(self, source_file, dest_file):
-        """Smart duplicate handling"""
-        source_hash = self.get_file_hash(source_file)
-        dest_hash = self.get_file_hash(dest_file)
-        
-        filename = os.path.basename(source_file)
-        
-        # Identical files - skip
-        if source_hash == dest_hash:
-            self.logger.info(f"   ✓ Identical file exists, skipping: {filename}")
-            os.remove(source_file)
-            self.stats.increment("files_skipped")
-            return
-        
-        # Compare modification times
-        source_mtime = os.path.getmtime(source_file)
-        dest_mtime = os.path.getmtime(dest_file)
-        
-        # Newer file - replace
-        if source_mtime > dest_mtime:
-            self.logger.info(f"   ↻ Replacing with newer version: {filename}")
-            os.remove(dest_file)
-            shutil.move(source_file, dest_file)
-            self.stats.increment("files_replaced")
-            return
-        
-        # Older file - create version
-        base_name = Path(dest_file).stem
-        extension = Path(dest_file).suffix
-        dest_dir = Path(dest_file).parent
-        
-        version = 1
-        while True:
-            new_name = f"{base_name}_v{version}{extension}"
-            new_path = dest_dir / new_name
-            if not new_path.exists():
-                self.logger.info(f"   ✓ Creating versioned file: {new_name}")
-                shutil.move(source_file, str(new_path))
-                self.stats.increment("files_versioned")
-                break
-            version += 1
+    def is_excluded_dir(self, dirname):
+        """Check whether a directory should be pruned from scans"""
+        if dirname in self.exclude_dirs:
+            return True
+        return bool(self.prefix_trie) and self.has_excluded_prefix(dirname)
+
+# Content Sniffing
+def _content_key(path, st):
+    """(device, inode, size, mtime) for caching by file content, or None
     
-    def organize_file(self, file_path):
-        """Organize a single file"""
-        if not os.path.isfile(file_path):
-            return
-        
-        filename = os.path.basename(file_path)
-        
-        # Check exclusions
-        if self.should_exclude(filename):
-            self.logger.debug(f"Skipping excluded file: {filename}")
-            return
-        
-        try:
-            dest_path, file_category = self.get_destination_path(file_path)
-            os.makedirs(dest_path, exist_ok=True)
-            dest_file = os.path.join(dest_path, filename)
-            
-            self.logger.info(f"\n📦 Processing: {filename}")
-            
-            # Handle duplicates or move
-            if os.path.exists(dest_file):
-                self.handle_duplicate(file_path, dest_file)
-            else:
-                shutil.move(file_path, dest_file)
-                self.logger.info(f"   ✓ Moved successfully")
-                self.logger.info(f"   → {dest_path}")
-                self.stats.increment("files_moved", file_category)
-        
-        except PermissionError as e:
-            self.logger.error(f"   ✗ Permission denied: {filename}")
-            self.stats.increment("errors")
-        except Exception as e:
-            self.logger.error(f"   ✗ Error organizing {filename}: {str(e)}")
-            self.stats.increment("errors")
+    Windows directory listings report st_dev and st_ino as 0, so the path
+    is stat'ed again; a file system without inode numbers gets no key.
+    """
+    if not (st.st_dev and st.st_ino):
+        st = os.stat(path)
+        if not (st.st_dev and st.st_ino):
+            return None
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+class ContentSniffer:
+    """Guess a file's extension from its first bytes
     
-    def on_created(self, event):
-        """Handle new file creation"""
-        if not event.is_directory:
-            filename = os.path.basename(event.src_path)
-            
-            if not self.should_exclude(filename):
-                self.pending_files[event.src_path] = time.time()
-                self.logger.info(f"\n⏱️  New file detected: {filename} ({self.name})")
-                self.logger.info(f"   Will organize in {self.delay_minutes} minutes")
+    Only used for files whose extension has no category. The header read
+    is bounded by max_header_bytes and results are cached by (device,
+    inode, size, mtime), so a file is read at most once while unchanged.
+    The guessed extension is mapped through file_types like any other.
+    """
     
-    def on_modified(self, event):
-        """Handle file modification - reset timer"""
-        if not event.is_directory:
-            filename = os.path.basename(event.src_path)
-            
-            if not self.should_exclude(filename):
-                if event.src_path in self.pending_files:
-                    self.pending_files[event.src_path] = time.time()
-                    self.logger.info(f"\n↻ File modified: {filename} ({self.name})")
-                    self.logger.info(f"   Timer reset - {self.delay_minutes} minutes")
+    # (offset, magic, extension), checked in order
+    SIGNATURES = (
+        (0, b"%PDF-", ".pdf"),
+        (0, b"{\\rtf", ".rtf"),
+        (0, b"\x89PNG\r\n\x1a\n", ".png"),
+        (0, b"\xff\xd8\xff", ".jpg"),
+        (0, b"GIF87a", ".gif"),
+        (0, b"GIF89a", ".gif"),
+        (0, b"\x00\x00\x01\x00", ".ico"),
+        (0, b"ID3", ".mp3"),
+        (0, b"\xff\xfb", ".mp3"),
+        (0, b"\xff\xf3", ".mp3"),
+        (0, b"fLaC", ".flac"),
+        (0, b"OggS", ".ogg"),
+        (0, b"FLV\x01", ".flv"),
+        (0, b"0&\xb2u\x8ef\xcf\x11", ".wmv"),
+        (0, b"Rar!\x1a\x07", ".rar"),
+        (0, b"7z\xbc\xaf\x27\x1c", ".7z"),
+        (0, b"\x1f\x8b", ".gz"),
+        (0, b"BZh", ".bz2"),
+        (257, b"ustar", ".tar"),
+        (0, b"MZ", ".exe"),
+        (0, b"#!", ".sh"),
+        (60, b"BOOKMOBI", ".mobi"),
+    )
     
-    def check_pending_files(self):
-        """Check pending files and organize if delay elapsed"""
-        current_time = time.time()
-        delay_seconds = self.delay_minutes * 60
+    # Zip-based formats, recognised by names in the first local headers
+    ZIP_MARKERS = (
+        (b"mimetypeapplication/epub+zip", ".epub"),
+        (b"mimetypeapplication/vnd.oasis.opendocument.text", ".odt"),
+        (b"mimetypeapplication/vnd.oasis.opendocument.spreadsheet", ".ods"),
+        (b"mimetypeapplication/vnd.oasis.opendocument.presentation", ".odp"),
+        (b"word/", ".docx"),
+        (b"xl/", ".xlsx"),
+        (b"ppt/", ".pptx"),
+    )
+    
+    def __init__(self, max_header_bytes=4096, cache_entries=10000):
+        self.max_header_bytes = max(512, max_header_bytes)
+        self.cache_entries = cache_entries
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.reads = 0
+    
+    @classmethod
+    def from_settings(cls, settings, previous=None):
+        """Create a sniffer from the classifier section, or None when disabled
         
-        files_to_move = []
-        for file_path, added_time in list(self.pending_files.items()):
-            if current_time - added_time >= delay_seconds:
-                files_to_move.append(file_path)
+        An existing sniffer with the same limits is returned as is, so a
+        config reload keeps its cache.
+        """
+        classifier_config = settings.get("classifier", {})
+        if not classifier_config.get("sniff_content", False):
+            return None
+        max_header_bytes = classifier_config.get("max_header_bytes", 4096)
+        cache_entries = classifier_config.get("cache_entries", 10000)
+        if (previous is not None and previous.max_header_bytes == max(512, max_header_bytes)
+                and previous.cache_entries == cache_entries):
+            return previous
+        return cls(max_header_bytes, cache_entries)
+    
+    def match(self, header):
+        """Return the extension a header belongs to, or "" if unknown"""
+        if header.startswith(b"PK\x03\x04"):
+            for marker, ext in self.ZIP_MARKERS:
+                if marker in header:
+                    return ext
+            return ".zip"
+        if header.startswith(b"RIFF") and len(header) >= 12:
+            return {b"WAVE": ".wav", b"AVI ": ".avi"}.get(header[8:12], "")
+        if header[4:8] == b"ftyp":
+            return ".mov" if header[8:12] == b"qt  " else ".mp4"
+        if header.startswith(b"\x1aE\xdf\xa3"):
+            return ".webm" if b"webm" in header[:64] else ".mkv"
+        if header.startswith(b"BM") and header[6:10] == b"\x00\x00\x00\x00":
+            return ".bmp"
+        for offset, magic, ext in self.SIGNATURES:
+            if header.startswith(magic, offset):
+                return ext
         
-        for file_path in files_to_move:
-            if os.path.exists(file_path):
-                self.logger.info(f"\n⏰ {self.delay_minutes} minutes elapsed!")
-                self.organize_file(file_path)
-            del self.pending_files[file_path]
+        text = header.lstrip(b"\xef\xbb\xbf \t\r\n")[:256].lower()
+        if text.startswith(b"<svg") or (text.startswith(b"<?xml") and b"<svg" in header.lower()):
+            return ".svg"
+        if text.startswith(b"<!doctype html") or text.startswith(b"<html"):
+            return ".html"
+        if text.startswith(b"<?xml"):
+            return ".xml"
+        return ""
     
-    def organize_existing_files(self):
-        """Organize all existing files in source folder"""
-        if not os.path.exists(self.source_folder):
-            return
+    def sniff(self, file_path, source_stat=None):
+        """Return the extension guessed from a file's header, or an empty string"""
+        try:
+            if source_stat is None:
+                source_stat = os.stat(file_path)
+            key = _content_key(file_path, source_stat)
+        except (OSError, AttributeError):
+            key = None
         
-        self.logger.info(f"\n📂 Organizing existing files in {self.name}...")
-        count = 0
+        if key is not None:
+            with self._lock:
+                ext = self._cache.get(key)
+                if ext is not None:
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+                    return ext
         
-        for file in os.listdir(self.source_folder):
-            file_path = os.path.join(self.source_folder, file)
-            if os.path.isfile(file_path):
-                self.organize_file(file_path)
-                count += 1
+        try:
+            with open(file_path, 'rb') as f:
+                header = f.read(self.max_header_bytes)
+        except OSError:
+            return ""
+        ext = self.match(header)
         
-        self.logger.info(f"   ✓ Organized {count} existing files from {self.name}\n")
+        if key is not None:
+            with self._lock:
+                self.reads += 1
+                self._cache[key] = ext
+                if len(self._cache) > self.cache_entries:
+                    self._cache.popitem(last=False)
+        return ext
 
-def setup_logging(config):
-    """Setup logging system"""
-    log_config = config.settings["logging"]
+# Content Index
+class ContentIndex:
+    """Persistent index of organized files: path, size, mtime, inode and hash"""
     
-    # Log level
-    log_level = getattr(logging, log_config.get("log_level", "INFO"))
+    def __init__(self, index_file="content_index.db", read_only=False):
+        self.index_file = index_file
+        self.read_only = read_only
+        self._lock = threading.Lock()
+        if read_only:
+            # Lookups only (plan runs); writes below become no-ops
+            uri = Path(os.path.abspath(index_file)).as_uri() + "?mode=ro"
+            self.conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            return
+        self.conn = sqlite3.connect(index_file, check_same_thread=False)
+        with self._lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                " path TEXT PRIMARY KEY,"
+                " root TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " mtime_ns INTEGER NOT NULL,"
+                " inode INTEGER NOT NULL,"
+                " algorithm TEXT,"
+                " hash TEXT)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS files_root_size ON files (root, size)")
+            self.conn.commit()
     
-    # Format
-    log_format = '%(asctime)s - %(levelname)s - %(message)s'
-    date_format = '%Y-%m-%d %H:%M:%S'
+    def record(self, path, root, st=None, algorithm=None, file_hash=None):
+        """Insert or refresh an entry after the organizer wrote a file"""
+        if self.read_only:
+            return
+        if st is None:
+            st = os.stat(path)
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO files (path, root, size, mtime_ns, inode, algorithm, hash)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, root, st.st_size, st.st_mtime_ns, st.st_ino, algorithm, file_hash)
+            )
+            self.conn.commit()
     
-    # Handlers
-    handlers = []
+    def forget(self, path):
+        """Drop an entry for a file that no longer exists"""
+        if self.read_only:
+            return
+        with self._lock:
+            self.conn.execute("DELETE FROM files WHERE path = ?", (path,))
+            self.conn.commit()
     
-    if log_config.get("console_output", True):
-        handlers.append(logging.StreamHandler(sys.stdout))
+    def cached_hash(self, path, st, algorithm):
+        """Return the stored hash if size and mtime still match, else None"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT size, mtime_ns, inode, algorithm, hash FROM files WHERE path = ?",
+                (path,)
+            ).fetchone()
+        if row is None:
+            return None
+        size, mtime_ns, inode, row_algorithm, file_hash = row
+        if size != st.st_size or mtime_ns != st.st_mtime_ns or inode != st.st_ino:
+            return None
+        if row_algorithm != algorithm:
+            return None
+        return file_hash
     
-    if log_config.get("log_to_file", False):
-        log_file = log_config.get("log_file", "file_organizer.log")
-        handlers.append(logging.FileHandler(log_file, encoding='utf-8'))
+    def update_hash(self, path, st, algorithm, file_hash):
+        """Store a freshly computed hash for an indexed path"""
+        if self.read_only:
+            return
+        with self._lock:
+            self.conn.execute(
+                "UPDATE files SET size = ?, mtime_ns = ?, inode = ?, algorithm = ?, hash = ?"
+                " WHERE path = ?",
+                (st.st_size, st.st_mtime_ns, st.st_ino, algorithm, file_hash, path)
+            )
+            self.conn.commit()
     
-    logging.basicConfig(
-        level=log_level,
-        format=log_format,
-        datefmt=date_format,
-        handlers=handlers
-    )
-
-def print_header():
-    """Print application header"""
-    print("\n" + "=" * 80)
-    print("  🚀 WINDOWS FILE ORGANIZER v5.0.0 - ADVANCED EDITION")
-    print("  Intelligent File Organization with Advanced Features")
-    print("=" * 80 + "\n")
+    def paths_with_size(self, root, size):
+        """Indexed paths under a destination root with the given size"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT path FROM files WHERE root = ? AND size = ?", (root, size)
+            ).fetchall()
+        return [row[0] for row in rows]
+    
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            try:
+                self.conn.close()
+            except sqlite3.Error:
+                pass
 
-def print_config_info(config):
-    """Print configuration information"""
-    general = config.settings["general"]
-    logging_config = config.settings["logging"]
-    stats_config = config.settings["statistics"]
+# Hashing
+def _hash_range(path, algorithm, offset, length):
+    """Digest of length bytes at offset, read through a read-only mapping
     
-    print("⚙️  Configuration:")
-    print(f"   Delay: {general['delay_minutes']} minutes")
-    print(f"   Check Interval: {general['check_interval_seconds']} seconds")
-    print(f"   Log to File: {logging_config['log_to_file']}")
-    print(f"   Statistics: {stats_config['enabled']}")
-    print()
+    Module level so process pool workers can run it.
+    """
+    hasher = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), length, offset=offset, access=mmap.ACCESS_READ) as mapped:
+            hasher.update(mapped)
+    return hasher.digest()
 
-def main():
-    """Main application entry point"""
+class HashService:
+    """Full-content hashing shared by all handlers
     
-    # Print header
-    print_header()
+    Files below pool_threshold are hashed inline with a large buffer.
+    Larger files are hashed in a process pool straight from a memory
+    mapping. The thread that asked still waits for the digest, but the
+    work runs outside this process, so event handling and other organize
+    threads (asyncio runtime, parallel bulk) keep going. Above
+    tree_threshold a file is split into tree_chunk sized leaves hashed in
+    parallel and combined into one root hash; tree hashes carry their own
+    label (e.g. "blake2b-tree16m") so they are never compared with flat
+    hashes. Results are cached by (device, inode, size, mtime) when the
+    file system reports inode numbers.
+    """
     
-    # Load configuration
-    print("📝 Loading configuration...")
-    config = ConfigManager()
-    print("   ✓ Configuration loaded\n")
+    _shared = {}
+    _shared_lock = threading.Lock()
     
-    # Setup logging
-    setup_logging(config)
-    logger = logging.getLogger(__name__)
+    def __init__(self, algorithm="blake2b", buffer_size_kb=1024, process_pool=True,
+                 pool_threshold_mb=64, workers=0, tree_threshold_mb=0, tree_chunk_mb=16,
+                 cache_entries=10000):
+        self.algorithm = algorithm
+        self.buffer_size = max(4, buffer_size_kb) * 1024
+        self.process_pool = process_pool
+        self.pool_threshold = max(1, pool_threshold_mb) * 1048576
+        self.workers = workers or os.cpu_count() or 2
+        self.tree_threshold = tree_threshold_mb * 1048576 if tree_threshold_mb else 0
+        self.tree_chunk = max(1, tree_chunk_mb) * 1048576
+        self.tree_label = f"{algorithm}-tree{max(1, tree_chunk_mb)}m"
+        self.cache_entries = cache_entries
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = None
+        self.logger = logging.getLogger(__name__)
     
-    # Initialize statistics
-    stats_config = config.settings["statistics"]
-    statistics = StatisticsTracker(
-        stats_file=stats_config.get("stats_file", "statistics.json"),
-        enabled=stats_config.get("enabled", True)
-    )
+    @classmethod
+    def shared(cls, settings):
+        """The service for a config's duplicates and hashing sections
+        
+        Handlers with the same settings share one service, and with it one
+        process pool and one cache.
+        """
+        params = cls._params(settings)
+        with cls._shared_lock:
+            service = cls._shared.get(params)
+            if service is None:
+                service = cls._shared[params] = cls(*params)
+        return service
+    
+    @staticmethod
+    def _params(settings):
+        dup_config = settings.get("duplicates", {})
+        hash_config = settings.get("hashing", {})
+        return (
+            dup_config.get("hash_algorithm", "blake2b"),
+            dup_config.get("buffer_size_kb", 1024),
+            hash_config.get("process_pool", True),
+            hash_config.get("pool_threshold_mb", 64),
+            hash_config.get("workers", 0),
+            hash_config.get("tree_threshold_mb", 0),
+            hash_config.get("tree_chunk_mb", 16),
+            hash_config.get("cache_entries", 10000)
+        )
+    
+    @classmethod
+    def retire_unused(cls, settings):
+        """Shut down the shared services a reloaded config no longer uses"""
+        keep = cls._params(settings)
+        with cls._shared_lock:
+            retired = [cls._shared.pop(params) for params in list(cls._shared) if params != keep]
+        for service in retired:
+            service.retire()
+    
+    @classmethod
+    def close_all(cls):
+        """Shut down the pools of every shared service"""
+        with cls._shared_lock:
+            services = list(cls._shared.values())
+        for service in services:
+            service.close()
+    
+    def label(self, size):
+        """Name of the hash scheme used for a file of this size"""
+        if self.tree_threshold and size >= self.tree_threshold:
+            return self.tree_label
+        return self.algorithm
+    
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None and self.process_pool:
+                # Forking a process that runs watcher and logging threads can copy held locks
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+    
+    def _pool_failed(self, error):
+        self.logger.warning(f"⚠️  Hash worker pool unavailable, hashing inline: {error}")
+        with self._lock:
+            self.process_pool = False
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+    
+    def _stream_hash(self, filepath):
+        hasher = hashlib.new(self.algorithm)
+        buffer = bytearray(self.buffer_size)
+        view = memoryview(buffer)
+        with open(filepath, "rb", buffering=0) as f:
+            while True:
+                n = f.readinto(buffer)
+                if not n:
+                    break
+                hasher.update(view[:n])
+        return hasher.hexdigest()
+    
+    def _tree_hash(self, filepath, size, pool):
+        ranges = [(offset, min(self.tree_chunk, size - offset))
+                  for offset in range(0, size, self.tree_chunk)]
+        if pool is not None:
+            futures = [pool.submit(_hash_range, filepath, self.algorithm, offset, length)
+                       for offset, length in ranges]
+            leaves = [future.result() for future in futures]
+        else:
+            leaves = [_hash_range(filepath, self.algorithm, offset, length)
+                      for offset, length in ranges]
+        root = hashlib.new(self.algorithm)
+        root.update(f"tree:{self.tree_chunk}:{size}:".encode())
+        for leaf in leaves:
+            root.update(leaf)
+        return root.hexdigest()
+    
+    def _compute(self, filepath, size):
+        if self.tree_threshold and size >= self.tree_threshold:
+            pool = self._get_pool()
+            try:
+                return self._tree_hash(filepath, size, pool)
+            except BrokenProcessPool as e:
+                self._pool_failed(e)
+            except RuntimeError:
+                pass  # pool shut down by retire() after we picked it up
+            return self._tree_hash(filepath, size, None)
+        
+        if size >= self.pool_threshold:
+            pool = self._get_pool()
+            if pool is not None:
+                try:
+                    return pool.submit(_hash_range, filepath, self.algorithm, 0, size).result().hex()
+                except BrokenProcessPool as e:
+                    self._pool_failed(e)
+                except RuntimeError:
+                    pass  # pool shut down by retire() after we picked it up
+        return self._stream_hash(filepath)
+    
+    def hash_file(self, filepath, st=None):
+        """Hex digest of a file, computed with the scheme label(st_size) returns
+        
+        Raises OSError if the file cannot be read.
+        """
+        if st is None:
+            st = os.stat(filepath)
+        key = _content_key(filepath, st)
+        if key is not None:
+            with self._lock:
+                file_hash = self._cache.get(key)
+                if file_hash is not None:
+                    self._cache.move_to_end(key)
+                    return file_hash
+        
+        file_hash = self._compute(filepath, st.st_size)
+        
+        if key is not None:
+            with self._lock:
+                self._cache[key] = file_hash
+                if len(self._cache) > self.cache_entries:
+                    self._cache.popitem(last=False)
+        return file_hash
+    
+    def clear_cache(self):
+        """Forget all cached results"""
+        with self._lock:
+            self._cache.clear()
+    
+    def close(self):
+        """Shut down the worker pool (restarted on demand)"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+    
+    def retire(self):
+        """Shut down the worker pool for good; hashes still in flight finish inline"""
+        with self._lock:
+            self.process_pool = False
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+# Duplicate Detector
+class DuplicateDetector:
+    """Tiered file comparison: size, then sampled hash, then full hash"""
+    
+    def __init__(self, hash_algorithm="blake2b", buffer_size_kb=1024,
+                 sample_block_kb=64, sample_blocks=4, statistics=None, index=None, hasher=None):
+        try:
+            hashlib.new(hash_algorithm)
+        except (ValueError, TypeError):
+            logging.warning(f"Unknown hash algorithm '{hash_algorithm}', using md5")
+            hash_algorithm = "md5"
+            hasher = None
+        self.hash_algorithm = hash_algorithm
+        self.buffer_size = max(4, buffer_size_kb) * 1024
+        self.sample_block = max(1, sample_block_kb) * 1024
+        self.sample_blocks = max(0, sample_blocks)
+        self.stats = statistics
+        self.index = index
+        self.hasher = hasher or HashService(hash_algorithm, buffer_size_kb, process_pool=False)
+        self.logger = logging.getLogger(__name__)
+    
+    @classmethod
+    def from_settings(cls, settings, statistics=None, index=None):
+        """Create a detector from the duplicates section of a config"""
+        dup_config = settings.get("duplicates", {})
+        return cls(
+            hash_algorithm=dup_config.get("hash_algorithm", "blake2b"),
+            buffer_size_kb=dup_config.get("buffer_size_kb", 1024),
+            sample_block_kb=dup_config.get("sample_block_kb", 64),
+            sample_blocks=dup_config.get("sample_blocks", 4),
+            statistics=statistics,
+            index=index,
+            hasher=HashService.shared(settings)
+        )
+    
+    def full_hash(self, filepath, st=None):
+        """Hash the whole file through the hash service"""
+        with _METRICS.timer("hash"):
+            try:
+                return self.hasher.hash_file(filepath, st)
+            except Exception as e:
+                self.logger.error(f"Hash calculation error: {e}")
+                return None
+    
+    def indexed_hash(self, filepath):
+        """Full hash of an organized file, served from the index when still valid"""
+        if self.index is None:
+            return self.full_hash(filepath)
+        try:
+            st = os.stat(filepath)
+        except FileNotFoundError:
+            self.index.forget(filepath)
+            return None
+        except OSError as e:
+            self.logger.error(f"Hash calculation error: {e}")
+            return None
+        
+        label = self.hasher.label(st.st_size)
+        file_hash = self.index.cached_hash(filepath, st, label)
+        if file_hash is None:
+            file_hash = self.full_hash(filepath, st)
+            if file_hash is not None:
+                self.index.update_hash(filepath, st, label, file_hash)
+        return file_hash
+    
+    def sample_offsets(self, size):
+        """Offsets of the head, tail and evenly spaced middle blocks"""
+        block = self.sample_block
+        offsets = [0]
+        span = size - block
+        for i in range(1, self.sample_blocks + 1):
+            offsets.append(span * i // (self.sample_blocks + 1))
+        offsets.append(span)
+        return offsets
+    
+    def sample_hash(self, filepath, size):
+        """Hash the head, tail and a few sampled middle blocks"""
+        with _METRICS.timer("hash"):
+            hasher = hashlib.new(self.hash_algorithm)
+            try:
+                with open(filepath, "rb") as f:
+                    for offset in self.sample_offsets(size):
+                        f.seek(offset)
+                        hasher.update(f.read(self.sample_block))
+                return hasher.hexdigest()
+            except Exception as e:
+                self.logger.error(f"Hash calculation error: {e}")
+                return None
+    
+    def _resolved(self, tier):
+        if self.stats is not None:
+            self.stats.record_duplicate_check(tier)
+    
+    def are_identical(self, source_file, dest_file, source_stat=None, dest_stat=None):
+        """Compare two files, stopping at the cheapest tier that decides"""
+        try:
+            source_size = (source_stat or os.stat(source_file)).st_size
+            dest_size = (dest_stat or os.stat(dest_file)).st_size
+        except OSError as e:
+            self.logger.error(f"Size check error: {e}")
+            return False
+        
+        # Tier 1: sizes
+        if source_size != dest_size:
+            self._resolved("size")
+            return False
+        
+        # Tier 2: sampled blocks, skipped when they would cover the whole file
+        if source_size > self.sample_block * (self.sample_blocks + 2):
+            source_sample = self.sample_hash(source_file, source_size)
+            dest_sample = self.sample_hash(dest_file, dest_size)
+            if source_sample is None or source_sample != dest_sample:
+                self._resolved("sample")
+                return False
+        
+        # Tier 3: full content (the destination may be served from the index)
+        source_hash = self.full_hash(source_file, source_stat)
+        dest_hash = self.indexed_hash(dest_file)
+        self._resolved("full")
+        return source_hash is not None and source_hash == dest_hash
+
+# Pending File Scheduler
+class PendingScheduler:
+    """Deadline-ordered pending files, stored compactly
+    
+    Deadlines are rounded up to TICK seconds and grouped into buckets; a
+    min-heap holds one entry per bucket, so ticks cost O(k) for k due files
+    instead of a sweep over every pending file. Each bucket is one flat
+    list of file names in which a shared per-directory marker precedes
+    every run of names from that directory, and a per-directory dict maps
+    each name to its current bucket. A pending file therefore costs its
+    name string, one dict slot and one or two list slots; no full path,
+    float or tuple is kept per file, and a bucket holding a few files
+    costs a single list however many directories they come from.
+    
+    Resetting a timer moves the name to a new bucket and leaves the old
+    occurrence behind; it is skipped when its bucket comes due, and the
+    buckets are rebuilt if superseded occurrences pile up.
+    """
+    
+    TICK = 0.05
+    
+    def __init__(self, wakeup=None):
+        self._names = {}
+        self._markers = {}
+        self._buckets = {}
+        self._ticks = []
+        self._count = 0
+        self._stale = 0
+        self._lock = threading.Lock()
+        self.wakeup = wakeup
+    
+    def __contains__(self, path):
+        directory, name = os.path.split(path)
+        names = self._names.get(directory)
+        return names is not None and name in names
+    
+    def __len__(self):
+        return self._count
+    
+    @staticmethod
+    def _append(bucket, marker, name):
+        # bucket[0] holds the marker of the last run, so a run only starts on a change
+        if bucket[0] is not marker:
+            bucket[0] = marker
+            bucket.append(marker)
+        bucket.append(name)
+    
+    def schedule(self, path, deadline):
+        """Set (or reset) the deadline of a path"""
+        tick = math.ceil(deadline / self.TICK)
+        directory, name = os.path.split(path)
+        with self._lock:
+            earliest = self._ticks[0] if self._ticks else None
+            names = self._names.get(directory)
+            if names is None:
+                marker = self._markers[directory] = (directory,)
+                names = self._names[marker[0]] = {}
+            else:
+                marker = self._markers[directory]
+            
+            bucket = self._buckets.get(tick)
+            old = names.get(name)
+            if old is None:
+                self._count += 1
+            elif old is bucket:
+                return
+            else:
+                self._stale += 1
+            
+            if bucket is None:
+                bucket = self._buckets[tick] = [None]
+                heapq.heappush(self._ticks, tick)
+            names[name] = bucket
+            self._append(bucket, marker, name)
+            
+            # Superseded occurrences pile up under constant resets; rebuild occasionally
+            if self._stale > self._count + 1024:
+                self._rebuild()
+        if self.wakeup is not None and (earliest is None or tick < earliest):
+            self.wakeup.set()
+    
+    def _rebuild(self):
+        fresh = {id(bucket): [None] for bucket in self._buckets.values()}
+        for directory, names in self._names.items():
+            marker = self._markers[directory]
+            for name, bucket in names.items():
+                new_bucket = fresh[id(bucket)]
+                names[name] = new_bucket
+                self._append(new_bucket, marker, name)
+        self._buckets = {
+            tick: fresh[id(bucket)] for tick, bucket in self._buckets.items() if len(fresh[id(bucket)]) > 1
+        }
+        self._ticks = list(self._buckets)
+        heapq.heapify(self._ticks)
+        self._stale = 0
+    
+    def _drop_directory(self, directory):
+        del self._names[directory]
+        del self._markers[directory]
+    
+    def discard(self, path):
+        """Stop tracking a path"""
+        directory, name = os.path.split(path)
+        with self._lock:
+            names = self._names.get(directory)
+            if names is None or names.pop(name, None) is None:
+                return
+            self._count -= 1
+            self._stale += 1
+            if not names:
+                self._drop_directory(directory)
+    
+    def pop_due(self, now):
+        """Remove and return (path, deadline) for every deadline that has passed"""
+        due = []
+        with self._lock:
+            ticks = self._ticks
+            while ticks and ticks[0] * self.TICK <= now:
+                tick = heapq.heappop(ticks)
+                bucket = self._buckets.pop(tick)
+                deadline = tick * self.TICK
+                directory = names = None
+                for i in range(1, len(bucket)):
+                    item = bucket[i]
+                    if type(item) is tuple:
+                        directory = item[0]
+                        names = self._names.get(directory)
+                    elif names is not None and names.get(item) is bucket:
+                        del names[item]
+                        self._count -= 1
+                        due.append((os.path.join(directory, item), deadline))
+                        if not names:
+                            self._drop_directory(directory)
+                            names = None
+                    else:
+                        self._stale -= 1
+        return due
+    
+    def next_deadline(self):
+        """Earliest bucket deadline, or None when nothing is pending
+        
+        A bucket holding only superseded entries can make this early; the
+        caller then wakes, finds nothing due and the bucket is dropped.
+        """
+        with self._lock:
+            return self._ticks[0] * self.TICK if self._ticks else None
+
+# Move Engine
+class MoveEngine:
+    """Move files with a rename on the same device and a single-pass copy across devices
+    
+    Cross-device moves stream the file once through a large buffer into a
+    temporary file next to the destination, hashing while copying when a
+    hash is wanted (so it can go straight into the content index). Without
+    hashing, Linux copies use os.copy_file_range / os.sendfile so the data
+    never enters user space. The copy is size-checked (and optionally
+    re-hashed), flushed, renamed into place, and only then is the source
+    removed.
+    """
+    
+    PARTIAL_SUFFIX = ".organizer-partial"
+    
+    def __init__(self, hash_algorithm="blake2b", buffer_size_kb=1024,
+                 hash_copies=True, verify_copy=False):
+        self.hash_algorithm = hash_algorithm
+        self.buffer_size = max(64, buffer_size_kb) * 1024
+        self.hash_copies = hash_copies
+        self.verify_copy = verify_copy
+        self._dir_devices = {}
+    
+    @classmethod
+    def from_settings(cls, settings, hash_copies=True):
+        """Create a move engine from the moves and duplicates sections of a config"""
+        move_config = settings.get("moves", {})
+        return cls(
+            hash_algorithm=settings.get("duplicates", {}).get("hash_algorithm", "blake2b"),
+            buffer_size_kb=move_config.get("buffer_size_kb", 1024),
+            hash_copies=hash_copies,
+            verify_copy=move_config.get("verify_copy", False)
+        )
+    
+    def _device_of(self, directory):
+        device = self._dir_devices.get(directory)
+        if device is None:
+            device = os.stat(directory).st_dev
+            self._dir_devices[directory] = device
+        return device
+    
+    def same_device(self, source_stat, dest_file, source_file=None):
+        """Check whether dest_file's directory is on the source's device
+        
+        A stat from a Windows directory listing has st_dev 0; the source
+        is stat'ed again then.
+        """
+        device = source_stat.st_dev
+        if not device and source_file is not None:
+            device = os.stat(source_file).st_dev
+        return device == self._device_of(os.path.dirname(dest_file))
+    
+    def move(self, source_file, dest_file, source_stat=None):
+        """Move a file, replacing dest_file if it exists
+        
+        Returns the content hash when one was computed during a copy,
+        otherwise None.
+        """
+        with _METRICS.timer("move"):
+            if source_stat is None:
+                source_stat = os.stat(source_file)
+            
+            if self.same_device(source_stat, dest_file, source_file):
+                os.replace(source_file, dest_file)
+                return None
+            
+            partial = dest_file + self.PARTIAL_SUFFIX
+            try:
+                if self.hash_copies or self.verify_copy:
+                    file_hash = self._copy_and_hash(source_file, partial)
+                else:
+                    file_hash = None
+                    self._copy_zero_copy(source_file, partial, source_stat.st_size)
+                
+                copied_size = os.stat(partial).st_size
+                if copied_size != source_stat.st_size:
+                    raise OSError(f"Copy size mismatch for {source_file}: "
+                                  f"{copied_size} of {source_stat.st_size} bytes")
+                if self.verify_copy and self._hash_file(partial) != file_hash:
+                    raise OSError(f"Copy verification failed for {source_file}")
+                
+                shutil.copystat(source_file, partial)
+                os.replace(partial, dest_file)
+            except BaseException:
+                if os.path.exists(partial):
+                    os.remove(partial)
+                raise
+            
+            os.remove(source_file)
+            return file_hash if self.hash_copies else None
+    
+    def _copy_and_hash(self, source_file, partial):
+        hasher = hashlib.new(self.hash_algorithm)
+        buffer = bytearray(self.buffer_size)
+        view = memoryview(buffer)
+        with open(source_file, "rb", buffering=0) as src, open(partial, "wb", buffering=0) as dst:
+            while True:
+                n = src.readinto(buffer)
+                if not n:
+                    break
+                chunk = view[:n]
+                hasher.update(chunk)
+                written = 0
+                while written < n:
+                    written += dst.write(chunk[written:])
+            os.fsync(dst.fileno())
+        return hasher.hexdigest()
+    
+    def _copy_zero_copy(self, source_file, partial, size):
+        with open(source_file, "rb") as src, open(partial, "wb") as dst:
+            src_fd, dst_fd = src.fileno(), dst.fileno()
+            copied = 0
+            try:
+                if hasattr(os, "copy_file_range"):
+                    while copied < size:
+                        n = os.copy_file_range(src_fd, dst_fd, self.buffer_size)
+                        if n == 0:
+                            break
+                        copied += n
+                elif hasattr(os, "sendfile") and sys.platform.startswith("linux"):
+                    while copied < size:
+                        n = os.sendfile(dst_fd, src_fd, copied, self.buffer_size)
+                        if n == 0:
+                            break
+                        copied += n
+                else:
+                    shutil.copyfileobj(src, dst, self.buffer_size)
+            except OSError:
+                # Kernel copy unsupported between these filesystems; finish in user space
+                src.seek(copied)
+                dst.seek(copied)
+                shutil.copyfileobj(src, dst, self.buffer_size)
+            dst.flush()
+            os.fsync(dst_fd)
+    
+    def _hash_file(self, path):
+        hasher = hashlib.new(self.hash_algorithm)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(self.buffer_size), b""):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
+# Move Journal
+class MoveJournal:
+    """Append-only JSON-lines journal of file operations
+    
+    Every move, replace, version and duplicate delete writes an intent
+    record before it touches the filesystem and a done/aborted record
+    afterwards. Records are flushed to the OS immediately (a killed process
+    loses nothing) and fsync'ed in batches, every fsync_every records or
+    fsync_interval_seconds, whichever comes first, so a power loss can
+    drop at most the last batch.
+    """
+    
+    KINDS = ("move", "replace", "version", "delete")
+    
+    def __init__(self, journal_file="move_journal.jsonl", fsync_every=64,
+                 fsync_interval_seconds=1.0):
+        self.journal_file = journal_file
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval_seconds
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._next_id = max(self.read(), default=0) + 1
+        self._file = open(journal_file, "a", encoding="utf-8")
+        self._unsynced = 0
+        self._stop_event = threading.Event()
+        self._syncer = None
+        if self.fsync_interval and self.fsync_interval > 0:
+            self._syncer = threading.Thread(
+                target=self._sync_loop, name="journal-sync", daemon=True
+            )
+            self._syncer.start()
+    
+    @classmethod
+    def from_settings(cls, settings):
+        """Create a journal from the journal section of a config"""
+        journal_config = settings.get("journal", {})
+        return cls(
+            journal_file=journal_config.get("journal_file", "move_journal.jsonl"),
+            fsync_every=journal_config.get("fsync_every", 64),
+            fsync_interval_seconds=journal_config.get("fsync_interval_seconds", 1)
+        )
+    
+    def read(self):
+        """Replay the journal into {id: operation} with each operation's latest state"""
+        operations = {}
+        if not os.path.exists(self.journal_file):
+            return operations
+        with open(self.journal_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn last line after a crash
+                operation = operations.get(record.get("id"))
+                if operation is None:
+                    operations[record.get("id")] = record
+                else:
+                    operation["state"] = record.get("state", operation["state"])
+        return operations
+    
+    def _append(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self._unsynced += 1
+            sync_now = self.fsync_every and self._unsynced >= self.fsync_every
+        if sync_now:
+            self.sync()
+    
+    def _sync_loop(self):
+        while not self._stop_event.wait(self.fsync_interval):
+            if self._unsynced:
+                self.sync()
+    
+    def sync(self):
+        """fsync everything written so far"""
+        with _METRICS.timer("journal_sync"):
+            with self._lock:
+                if self._file.closed:
+                    return
+                self._unsynced = 0
+                os.fsync(self._file.fileno())
+    
+    def begin(self, kind, source_file, dest_file, source_stat=None):
+        """Record the intent to perform an operation and return its id"""
+        with self._lock:
+            op_id = self._next_id
+            self._next_id += 1
+        record = {
+            "id": op_id,
+            "state": "intent",
+            "op": kind,
+            "time": time.time(),
+            "source": source_file,
+            "dest": dest_file,
+            "size": source_stat.st_size if source_stat is not None else None,
+            "mtime_ns": source_stat.st_mtime_ns if source_stat is not None else None
+        }
+        if kind != "delete":
+            # What is at the destination now, so recovery can tell it from our copy
+            try:
+                st = os.stat(dest_file)
+                record["dest_prior"] = [st.st_ino, st.st_size, st.st_mtime_ns]
+            except OSError:
+                record["dest_prior"] = None
+            if source_stat is not None:
+                try:
+                    device = source_stat.st_dev or os.stat(source_file).st_dev
+                    record["same_device"] = device == os.stat(os.path.dirname(dest_file)).st_dev
+                except OSError:
+                    pass
+        self._append(record)
+        return op_id
+    
+    def finish(self, op_id, state="done"):
+        """Record the outcome of an operation (done, aborted or undone)"""
+        self._append({"id": op_id, "state": state})
+    
+    def _matches(self, path, operation):
+        """Whether path is provably the completed copy of the operation's source
+        
+        The file must differ from whatever was at the destination when the
+        intent was written; records without that information only count for
+        plain moves, where the destination did not exist.
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        if operation.get("size") is None:
+            return False
+        if "dest_prior" not in operation:
+            if operation.get("op") != "move":
+                return False
+        elif operation["dest_prior"] is not None:
+            prior_ino, prior_size, prior_mtime_ns = operation["dest_prior"]
+            # The copy is renamed over the destination, so it has a new inode
+            if st.st_ino and st.st_ino == prior_ino:
+                return False
+            if st.st_size == prior_size and st.st_mtime_ns == prior_mtime_ns:
+                return False
+        # copystat keeps the mtime; allow for coarse (FAT) timestamps
+        return (st.st_size == operation["size"]
+                and abs(st.st_mtime_ns - operation["mtime_ns"]) <= 2 * 10**9)
+    
+    def recover(self):
+        """Resume or roll back operations interrupted by a crash
+        
+        Returns (resumed, rolled_back). Rolled-back files are left in their
+        source folder and are organized again by the normal pipeline.
+        """
+        resumed = rolled_back = 0
+        for op_id, operation in self.read().items():
+            if operation.get("state") != "intent":
+                continue
+            source_file, dest_file = operation["source"], operation["dest"]
+            kind = operation.get("op")
+            try:
+                partial = dest_file + MoveEngine.PARTIAL_SUFFIX
+                if os.path.exists(partial):
+                    os.remove(partial)
+                source_exists = os.path.exists(source_file)
+                
+                if kind == "delete":
+                    state = "aborted" if source_exists else "done"
+                elif not source_exists:
+                    state = "done" if os.path.exists(dest_file) else "aborted"
+                    if state == "aborted":
+                        self.logger.warning(f"⚠️  Journal: {source_file} and {dest_file} are both missing")
+                elif not operation.get("same_device") and self._matches(dest_file, operation):
+                    # Copied into place but the source was not removed yet
+                    os.remove(source_file)
+                    state = "done"
+                else:
+                    # A same-device rename is atomic, so a source still in place means
+                    # it never happened; an unproven copy is not trusted either
+                    state = "aborted"
+                    # Drop the empty placeholder of an unfinished version
+                    if (kind == "version" and operation.get("dest_prior") is None
+                            and os.path.exists(dest_file)
+                            and os.path.getsize(dest_file) == 0 and operation.get("size")):
+                        os.remove(dest_file)
+            except OSError as e:
+                self.logger.error(f"   ✗ Journal recovery failed for {source_file}: {e}")
+                continue
+            
+            self.finish(op_id, state)
+            if state == "done":
+                resumed += 1
+            else:
+                rolled_back += 1
+        self.sync()
+        return resumed, rolled_back
+    
+    def undo(self, since, until=None, mover=None, index=None):
+        """Reverse completed operations in a time range, newest first
+        
+        Moved, replaced and versioned files go back to their source path;
+        deleted duplicates are restored by copying the identical file that
+        was kept. The older file overwritten by a replace is not recoverable.
+        Returns the number of operations undone.
+        """
+        until = until if until is not None else time.time()
+        mover = mover or MoveEngine(hash_copies=False)
+        operations = [
+            op for op in self.read().values()
+            if op.get("state") == "done" and since <= op.get("time", 0) < until
+        ]
+        operations.sort(key=lambda op: op["time"], reverse=True)
+        
+        undone = 0
+        created_dirs = set()
+        for operation in operations:
+            source_file, dest_file = operation["source"], operation["dest"]
+            if os.path.exists(source_file) or not os.path.exists(dest_file):
+                self.logger.warning(f"⚠️  Cannot undo {operation['op']} of {source_file}: "
+                                    f"source exists or destination is gone")
+                continue
+            source_dir = os.path.dirname(source_file)
+            try:
+                if source_dir not in created_dirs:
+                    os.makedirs(source_dir, exist_ok=True)
+                    created_dirs.add(source_dir)
+                if operation["op"] == "delete":
+                    shutil.copy2(dest_file, source_file)
+                else:
+                    mover.move(dest_file, source_file)
+                    if index is not None:
+                        index.forget(dest_file)
+            except OSError as e:
+                self.logger.error(f"   ✗ Undo failed for {source_file}: {e}")
+                continue
+            self.finish(operation["id"], "undone")
+            undone += 1
+        self.sync()
+        return undone
+    
+    def compact(self, retention_days):
+        """Rewrite the journal with one line per operation, dropping old finished ones"""
+        cutoff = time.time() - retention_days * 86400 if retention_days else None
+        with self._lock:
+            operations = self.read()
+            kept = [
+                op for op in operations.values()
+                if op.get("state") == "intent" or cutoff is None or op.get("time", 0) >= cutoff
+            ]
+            if len(kept) == len(operations) and not cutoff:
+                return 0
+            journal_dir = os.path.dirname(os.path.abspath(self.journal_file))
+            fd, tmp_path = tempfile.mkstemp(prefix=".journal-", suffix=".tmp", dir=journal_dir)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    for op in kept:
+                        f.write(json.dumps(op, ensure_ascii=False) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._file.close()
+                os.replace(tmp_path, self.journal_file)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            finally:
+                if self._file.closed:
+                    self._file = open(self.journal_file, "a", encoding="utf-8")
+                self._unsynced = 0
+        return len(operations) - len(kept)
+    
+    def close(self):
+        """Stop the background syncer and fsync the journal"""
+        self._stop_event.set()
+        if self._syncer is not None and self._syncer is not threading.current_thread():
+            self._syncer.join(timeout=5)
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+# Destination Resolver
+class DestinationResolver:
+    """Year/month bucket cache and a record of destination folders known to exist
+    
+    The current bucket is formatted once and reused until the next month
+    starts. In mtime mode each month is formatted once and remembered, so a
+    batch of files resolves every month directory only once. Directories
+    are created the first time they are needed and not stat'ed again.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._months = {}
+        self._current = None
+        self._current_start = 0.0
+        self._current_end = 0.0
+        self._existing = set()
+    
+    def _month_bucket(self, year, month):
+        bucket = self._months.get((year, month))
+        if bucket is None:
+            first_day = datetime(year, month, 1)
+            bucket = (first_day.strftime("%Y"), first_day.strftime("%m_%B"))
+            self._months[(year, month)] = bucket
+        return bucket
+    
+    def current_bucket(self):
+        """(year, month) folder names for now, refreshed at month rollover"""
+        now = time.time()
+        if not (self._current_start <= now < self._current_end):
+            with self._lock:
+                today = datetime.fromtimestamp(now)
+                start = datetime(today.year, today.month, 1)
+                if today.month == 12:
+                    end = datetime(today.year + 1, 1, 1)
+                else:
+                    end = datetime(today.year, today.month + 1, 1)
+                self._current = self._month_bucket(today.year, today.month)
+                self._current_start = start.timestamp()
+                self._current_end = end.timestamp()
+        return self._current
+    
+    def bucket_for(self, mtime):
+        """(year, month) folder names for a modification time"""
+        local = time.localtime(mtime)
+        return self._month_bucket(local.tm_year, local.tm_mon)
+    
+    def ensure_dir(self, path):
+        """Create a destination directory unless it is already known to exist"""
+        if path in self._existing:
+            return
+        with _METRICS.timer("makedirs"):
+            os.makedirs(path, exist_ok=True)
+            self._existing.add(path)
+    
+    def forget(self, path):
+        """Drop a directory that turned out to be missing"""
+        self._existing.discard(path)
+
+_DESTINATIONS = DestinationResolver()
+
+# Version Allocator
+class VersionAllocator:
+    """Per-directory cache of the highest _vN suffix in use for each file stem
+    
+    A directory is scanned once, the first time a version is needed in it;
+    afterwards allocation is a dict lookup. The chosen name is claimed with
+    an exclusive create, so concurrent workers never pick the same suffix
+    and a stale cache only costs a retry.
+    """
+    
+    _VERSION_RE = re.compile(r"^(.*)_v(\d+)$")
+    
+    def __init__(self):
+        self._dirs = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _split(filename):
+        extension = _file_suffix(filename)
+        stem = filename[:-len(extension)] if extension else filename
+        return stem, extension
+    
+    def _key(self, stem, extension):
+        return os.path.normcase(stem), os.path.normcase(extension)
+    
+    def _note(self, versions, filename):
+        stem, extension = self._split(filename)
+        match = self._VERSION_RE.match(stem)
+        if match:
+            key = self._key(match.group(1), extension)
+            version = int(match.group(2))
+            if version > versions.get(key, 0):
+                versions[key] = version
+    
+    def _versions_for(self, directory):
+        versions = self._dirs.get(directory)
+        if versions is None:
+            versions = {}
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        self._note(versions, entry.name)
+            except OSError:
+                pass
+            self._dirs[directory] = versions
+        return versions
+    
+    def observe(self, path):
+        """Record a file that was moved into an already scanned directory"""
+        directory, filename = os.path.split(path)
+        with self._lock:
+            versions = self._dirs.get(directory)
+            if versions is not None:
+                self._note(versions, filename)
+    
+    def candidates(self, dest_file):
+        """Yield versioned names for dest_file, starting after the highest known"""
+        directory, filename = os.path.split(dest_file)
+        stem, extension = self._split(filename)
+        key = self._key(stem, extension)
+        with self._lock:
+            version = self._versions_for(directory).get(key, 0) + 1
+        while True:
+            yield os.path.join(directory, f"{stem}_v{version}{extension}")
+            version += 1
+    
+    def claim(self, path):
+        """Create the empty placeholder for a candidate name
+        
+        Returns False if the name is already taken. The caller moves the
+        real file over the placeholder (or removes it on failure).
+        """
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        os.close(fd)
+        self.observe(path)
+        return True
+    
+    def reserve(self, dest_file):
+        """Claim the next free versioned name for dest_file and return its path"""
+        for new_path in self.candidates(dest_file):
+            if self.claim(new_path):
+                return new_path
+
+_VERSION_ALLOCATOR = VersionAllocator()
+
+# Readiness Detector
+class _ProbeState:
+    """Last observed size/mtime of a pending file"""
+    __slots__ = ("size", "mtime_ns", "stable_probes", "last_change")
+    
+    def __init__(self, last_change):
+        self.size = -1
+        self.mtime_ns = -1
+        self.stable_probes = 0
+        self.last_change = last_change
+
+def _can_open_exclusively(path):
+    """Check that the file can be opened exclusively
+    
+    Only on Windows does this prove no other program is writing it. On
+    POSIX it only fails while another process holds a flock() on the
+    file, which ordinary writers never take.
+    """
+    if os.name == "nt":
+        # Writers normally deny write sharing, so opening for writing fails
+        try:
+            fd = os.open(path, os.O_RDWR | getattr(os, "O_BINARY", 0))
+        except OSError:
+            return False
+        os.close(fd)
+        return True
+    try:
+        import fcntl
+    except ImportError:
+        return True
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return False
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        return True
+    except OSError:
+        return False
+    finally:
+        os.close(fd)
+
+class ReadinessDetector:
+    """Decide when a pending file is provably stable
+    
+    A file is ready once its size and mtime have not changed over
+    stable_probes consecutive probes, it has been quiet for at least the
+    minimum age of its category, and (optionally) it can be opened
+    exclusively, which on Windows means no other program is writing it.
+    delay_minutes still applies as an upper bound.
+    """
+    
+    def __init__(self, probe_interval_seconds=5, stable_probes=2, min_age_seconds=10,
+                 category_min_age_seconds=None, require_exclusive_open=True):
+        self.probe_interval = max(0.1, probe_interval_seconds)
+        self.stable_probes = max(1, stable_probes)
+        self.min_age = min_age_seconds
+        self.category_min_age = category_min_age_seconds or {}
+        self.require_exclusive_open = require_exclusive_open
+        self._states = {}
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_settings(cls, settings):
+        """Create a detector from the readiness section, or None when disabled"""
+        readiness = settings.get("readiness", {})
+        if not readiness.get("adaptive", False):
+            return None
+        return cls(
+            probe_interval_seconds=readiness.get("probe_interval_seconds", 5),
+            stable_probes=readiness.get("stable_probes", 2),
+            min_age_seconds=readiness.get("min_age_seconds", 10),
+            category_min_age_seconds=readiness.get("category_min_age_seconds", {}),
+            require_exclusive_open=readiness.get("require_exclusive_open", True)
+        )
+    
+    def touched(self, path, now):
+        """Record a create/modify event for a path"""
+        with self._lock:
+            state = self._states.get(path)
+            if state is None:
+                self._states[path] = _ProbeState(now)
+            else:
+                state.stable_probes = 0
+                state.last_change = now
+    
+    def last_change(self, path, default):
+        """Monotonic time of the last observed change"""
+        state = self._states.get(path)
+        return state.last_change if state is not None else default
+    
+    def forget(self, path):
+        """Stop tracking a path"""
+        with self._lock:
+            self._states.pop(path, None)
+    
+    def inherit(self, previous):
+        """Take over the probe state of the detector this one replaces"""
+        with previous._lock:
+            self._states = previous._states
+    
+    def is_ready(self, path, category, now):
+        """Probe a pending file; True once it is provably stable"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        
+        with self._lock:
+            state = self._states.get(path)
+            if state is None:
+                state = self._states[path] = _ProbeState(now)
+            if st.st_size != state.size or st.st_mtime_ns != state.mtime_ns:
+                # The first probe only records a baseline; the last change stays the
+                # event (or, after a rescan, the mtime) that queued the file
+                if state.size != -1:
+                    state.last_change = now
+                state.size = st.st_size
+                state.mtime_ns = st.st_mtime_ns
+                state.stable_probes = 0
+                return False
+            state.stable_probes += 1
+            if state.stable_probes < self.stable_probes:
+                return False
+            if now - state.last_change < self.category_min_age.get(category, self.min_age):
+                return False
+        
+        return not self.require_exclusive_open or _can_open_exclusively(path)
+
+# Event Coalescer
+class EventCoalescer:
+    """Per-path coalescing of repeated events for files that are already pending
+    
+    The first event in a window resets the file's timer; later events in the
+    same window only record their time, and the newest recorded time is
+    applied when the timer comes due. Timer and log work per file is thus
+    bounded by one reset per window however many writes it gets. Only the
+    first reset of a pending file is logged; the rest are counted and
+    reported in a periodic summary.
+    """
+    
+    COALESCED = 0
+    APPLY = 1
+    APPLY_QUIET = 2
+    
+    def __init__(self, window_seconds=1.0, summary_interval_seconds=60):
+        self.window = window_seconds
+        self.summary_interval = summary_interval_seconds
+        self._applied = {}
+        self._latest = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+        self._unreported = 0
+        self._last_summary = time.monotonic()
+    
+    @classmethod
+    def from_settings(cls, settings):
+        """Create a coalescer from the events section of a config"""
+        events = settings.get("events", {})
+        return cls(
+            window_seconds=events.get("coalesce_window_seconds", 1),
+            summary_interval_seconds=events.get("log_summary_interval_seconds", 60)
+        )
+    
+    def event(self, path, now):
+        """Classify an event for a pending path: COALESCED, APPLY or APPLY_QUIET"""
+        with self._lock:
+            applied = self._applied.get(path)
+            if applied is not None and now - applied < self.window:
+                self._latest[path] = now
+                self.coalesced += 1
+                self._unreported += 1
+                return self.COALESCED
+            self._applied[path] = now
+            self._latest.pop(path, None)
+            if applied is None:
+                return self.APPLY
+            self._unreported += 1
+            return self.APPLY_QUIET
+    
+    def take_latest(self, path):
+        """Stop tracking a path; return the time of an event not yet applied, if any"""
+        with self._lock:
+            self._applied.pop(path, None)
+            return self._latest.pop(path, None)
+    
+    def summary(self, now):
+        """Number of unlogged events when a summary is due, else 0"""
+        if not self._unreported or now - self._last_summary < self.summary_interval:
+            return 0
+        with self._lock:
+            count = self._unreported
+            self._unreported = 0
+            self._last_summary = now
+        return count
+
+# Destination locks: serialize workers that target the same file name
+_DEST_LOCKS = [threading.Lock() for _ in range(64)]
+
+def _dest_lock(dest_file):
+    """Return the lock guarding a destination path"""
+    return _DEST_LOCKS[hash(os.path.normcase(dest_file)) % len(_DEST_LOCKS)]
+
+# Advanced File Organizer Handler
+class AdvancedFileOrganizerHandler(FileSystemEventHandler):
+    """Advanced file organization with v5.0.0 features"""
+    
+    def __init__(self, source_config, config_manager, statistics, content_index=None, wakeup=None,
+                 journal=None):
+        self.config = config_manager
+        self.stats = statistics
+        self.name = source_config["name"]
+        self.source_folder = str(Path.home() / source_config["folder"])
+        self.index = content_index
+        self.journal = journal
+        self.versions = _VERSION_ALLOCATOR
+        self.destinations = _DESTINATIONS
+        
+        # Pending files, ordered by deadline; periodic rescans above the high-water mark
+        self.pending_files = PendingScheduler(wakeup)
+        self.rescan_mode = False
+        self.next_rescan = None
+        self.readiness = None
+        self.readiness_settings = None
+        self.coalescer = None
+        self.sniffer = None
+        
+        # Logger
+        self.logger = logging.getLogger(__name__)
+        
+        # Everything derived from the config (replaced on reload)
+        self.apply_settings(config_manager.settings, source_config)
+    
+    def apply_settings(self, settings, source_config):
+        """Build rule snapshots and settings, then swap them in at once
+        
+        Everything is computed before the handler is touched and assigned
+        with a single dict update, so event and worker threads see either
+        the old or the new settings. Pending timers, readiness probe state
+        and coalesced events are kept.
+        """
+        if str(Path.home() / source_config["folder"]) != self.source_folder:
+            raise ValueError(f"Source folder of {self.name} changed; create a new handler")
+        
+        readiness = ReadinessDetector.from_settings(settings)
+        if self.readiness is not None and readiness is not None:
+            if settings.get("readiness") == self.readiness_settings:
+                readiness = self.readiness
+            else:
+                readiness.inherit(self.readiness)
+        
+        coalescer = self.coalescer or EventCoalescer.from_settings(settings)
+        events = settings.get("events", {})
+        coalescer.window = events.get("coalesce_window_seconds", 1)
+        coalescer.summary_interval = events.get("log_summary_interval_seconds", 60)
+        
+        pending_config = settings.get("pending", {})
+        dest_base = source_config["destination_drive"]
+        dest_folder = source_config["destination_folder"]
+        snapshot = {
+            "source_config": source_config,
+            "dest_base": dest_base,
+            "dest_folder": dest_folder,
+            "dest_root": os.path.join(dest_base, dest_folder),
+            "recursive": source_config.get("recursive", False),
+            "max_depth": source_config.get("max_depth", 0),
+            "watch_mode": source_config.get("watch_mode", "auto"),
+            "polling": resolve_watch_mode(
+                source_config.get("watch_mode", "auto"),
+                self.source_folder,
+                settings.get("polling", {}).get("network_fs_types", [])
+            ),
+            "delay_minutes": settings["general"]["delay_minutes"],
+            "bucket_by": settings["general"].get("bucket_by", "now"),
+            "readiness": readiness,
+            "readiness_settings": settings.get("readiness"),
+            "coalescer": coalescer,
+            "file_types": settings["file_types"],
+            "exclusions": settings["exclusions"],
+            "rules": CompiledRules.from_settings(settings),
+            "sniffer": ContentSniffer.from_settings(settings, self.sniffer),
+            "mover": MoveEngine.from_settings(settings, hash_copies=self.index is not None),
+            "dedupe_across_folders": settings.get("index", {}).get("dedupe_across_folders", False),
+            "duplicates": DuplicateDetector.from_settings(settings, self.stats, self.index),
+            "high_water_mark": pending_config.get("high_water_mark", 100000),
+            "low_water_mark": pending_config.get("low_water_mark", 10000),
+            "rescan_interval": pending_config.get("rescan_interval_seconds", 60)
+        }
+        self.__dict__.update(snapshot)
+    
+    def get_file_hash(self, filepath):
+        """Calculate content hash for duplicate detection"""
+        return self.duplicates.full_hash(filepath)
+    
+    def get_file_type_category(self, file_ext):
+        """Get file type category"""
+        return self.rules.category_for(file_ext)
+    
+    def get_destination_path(self, file_path, source_stat=None):
+        """Generate organized destination path"""
+        if self.bucket_by == "mtime":
+            if source_stat is None:
+                source_stat = os.stat(file_path)
+            year, month = self.destinations.bucket_for(source_stat.st_mtime)
+        else:
+            year, month = self.destinations.current_bucket()
+        
+        file_ext = _file_suffix(os.path.basename(file_path)).lower()
+        type_category = self.get_file_type_category(file_ext)
+        
+        # Only files the extension does not place pay for a header read
+        if type_category == "others" and self.sniffer is not None:
+            sniffed_ext = self.sniffer.sniff(file_path, source_stat)
+            if sniffed_ext:
+                type_category = self.get_file_type_category(sniffed_ext)
+        
+        dest_path = os.path.join(
+            self.dest_base,
+            self.dest_folder,
+            year,
+            month,
+            type_category
+        )
+        
+        if self.recursive:
+            # Keep the subfolder, so same-named files from different folders never collide
+            subfolder = os.path.relpath(os.path.dirname(file_path), self.source_folder)
+            if subfolder != os.curdir and not subfolder.startswith(os.pardir):
+                dest_path = os.path.join(dest_path, subfolder)
+        
+        return dest_path, type_category
+    
+    def should_exclude(self, filename):
+        """Check if file should be excluded"""
+        with _METRICS.timer("exclusion"):
+            return self.rules.is_excluded(filename)
+    
+    def index_file(self, dest_file, file_hash=None):
+        """Record a file the organizer just wrote in the content index"""
+        if self.index is None:
+            return
+        try:
+            st = os.stat(dest_file)
+            # Copies are hashed flat; files that get tree hashes are hashed again on demand
+            if file_hash and self.duplicates.hasher.label(st.st_size) != self.duplicates.hash_algorithm:
+                file_hash = None
+            algorithm = self.duplicates.hash_algorithm if file_hash else None
+            self.index.record(dest_file, self.dest_root, st, algorithm=algorithm, file_hash=file_hash)
+        except Exception as e:
+            self.logger.debug(f"Index update failed for {dest_file}: {e}")
+    
+    def move_file(self, source_file, dest_file, source_stat=None, kind="move", op_id=None):
+        """Move a file into place, journal it and index it
+        
+        op_id is an intent the caller already journaled for this move.
+        """
+        if self.journal is not None and op_id is None:
+            if source_stat is None:
+                source_stat = os.stat(source_file)
+            op_id = self.journal.begin(kind, source_file, dest_file, source_stat)
+        try:
+            try:
+                file_hash = self.mover.move(source_file, dest_file, source_stat)
+            except FileNotFoundError:
+                # Destination folder removed behind our back: recreate it once
+                dest_dir = os.path.dirname(dest_file)
+                if not os.path.exists(source_file) or os.path.isdir(dest_dir):
+                    raise
+                self.destinations.forget(dest_dir)
+                self.destinations.ensure_dir(dest_dir)
+                file_hash = self.mover.move(source_file, dest_file, source_stat)
+        except BaseException:
+            if op_id is not None:
+                self.journal.finish(op_id, "aborted" if os.path.exists(source_file) else "done")
+            raise
+        if op_id is not None:
+            self.journal.finish(op_id)
+        self.index_file(dest_file, file_hash)
+    
+    def remove_duplicate(self, source_file, kept_file):
+        """Delete a source file whose content already exists at kept_file"""
+        op_id = None
+        if self.journal is not None:
+            op_id = self.journal.begin("delete", source_file, kept_file)
+        try:
+            os.remove(source_file)
+        except BaseException:
+            if op_id is not None:
+                self.journal.finish(op_id, "aborted")
+            raise
+        if op_id is not None:
+            self.journal.finish(op_id)
+    
+    def find_indexed_duplicate(self, file_path, dest_file, size):
+        """Look for identical content anywhere under the destination root"""
+        if self.index is None or not self.dedupe_across_folders:
+            return None
+        
+        candidates = [p for p in self.index.paths_with_size(self.dest_root, size) if p != dest_file]
+        if not candidates:
+            return None
+        
+        source_hash = self.duplicates.full_hash(file_path)
+        if source_hash is None:
+            return None
+        for candidate in candidates:
+            if self.duplicates.indexed_hash(candidate) == source_hash:
+                return candidate
+        return None
+    
+    def classify_duplicate(self, source_file, dest_file, source_stat, dest_stat):
+        """Decide how a name collision is resolved: skip_identical, replace or version"""
+        # Identical files - skip
+        if self.duplicates.are_identical(source_file, dest_file, source_stat, dest_stat):
+            return "skip_identical"
+        
+        # Newer file - replace, older file - create version
+        if source_stat.st_mtime > dest_stat.st_mtime:
+            return "replace"
+        return "version"
+    
+    def handle_duplicate(self, source_file, dest_file, source_stat=None, dest_stat=None):
+        """Smart duplicate handling"""
+        source_stat = source_stat or os.stat(source_file)
+        dest_stat = dest_stat or os.stat(dest_file)
+        action = self.classify_duplicate(source_file, dest_file, source_stat, dest_stat)
+        self.resolve_duplicate(action, source_file, dest_file, source_stat)
+    
+    def reserve_version(self, source_file, dest_file, source_stat):
+        """Claim a versioned name for source_file; returns (path, journal op id)
+        
+        The intent is journaled before the empty placeholder is created, so
+        recovery can remove a placeholder left behind by a crash.
+        """
+        if self.journal is None:
+            return self.versions.reserve(dest_file), None
+        for new_path in self.versions.candidates(dest_file):
+            op_id = self.journal.begin("version", source_file, new_path, source_stat)
+            if self.versions.claim(new_path):
+                return new_path, op_id
+            self.journal.finish(op_id, "aborted")
+    
+    def resolve_duplicate(self, action, source_file, dest_file, source_stat):
+        """Carry out a duplicate decision"""
+        filename = os.path.basename(source_file)
+        
+        if action == "skip_identical":
+            self.logger.info(f"   ✓ Identical file exists, skipping: {filename}")
+            self.remove_duplicate(source_file, dest_file)
+            self.stats.increment("files_skipped")
+            return
+        
+        if action == "replace":
+            self.logger.info(f"   ↻ Replacing with newer version: {filename}")
+            self.move_file(source_file, dest_file, source_stat, kind="replace")
+            self.stats.increment("files_replaced")
+            return
+        
+        # Older file - create version
+        new_path, op_id = self.reserve_version(source_file, dest_file, source_stat)
+        self.logger.info(f"   ✓ Creating versioned file: {os.path.basename(new_path)}")
+        try:
+            self.move_file(source_file, new_path, source_stat, kind="version", op_id=op_id)
+        except Exception:
+            if os.path.exists(source_file):
+                os.remove(new_path)
+            raise
+        self.stats.increment("files_versioned")
+    
+    def organize_file(self, file_path, entry=None):
+        """Organize a single file (entry: optional os.DirEntry from a scan)"""
+        with _METRICS.timer("organize"):
+            if entry is not None:
+                filename = entry.name
+            else:
+                filename = os.path.basename(file_path)
+            
+            # Check exclusions
+            if self.should_exclude(filename):
+                self.logger.debug(f"Skipping excluded file: {filename}")
+                return
+            
+            try:
+                if entry is not None:
+                    if not entry.is_file():
+                        return
+                    source_stat = entry.stat()
+                else:
+                    source_stat = os.stat(file_path)
+                    if not stat.S_ISREG(source_stat.st_mode):
+                        return
+            except OSError:
+                return
+            
+            try:
+                dest_path, file_category = self.get_destination_path(file_path, source_stat)
+                self.destinations.ensure_dir(dest_path)
+                dest_file = os.path.join(dest_path, filename)
+                
+                self.logger.info(f"\n📦 Processing: {filename}")
+                
+                with _dest_lock(dest_file):
+                    # Same content already organized elsewhere (other month/category)
+                    existing = self.find_indexed_duplicate(file_path, dest_file, source_stat.st_size)
+                    if existing:
+                        self.logger.info(f"   ✓ Identical file exists at {existing}, skipping: {filename}")
+                        self.remove_duplicate(file_path, existing)
+                        self.stats.increment("files_skipped")
+                        return
+                    
+                    # Handle duplicates or move
+                    try:
+                        dest_stat = os.stat(dest_file)
+                    except FileNotFoundError:
+                        dest_stat = None
+                    
+                    if dest_stat is not None:
+                        self.handle_duplicate(file_path, dest_file, source_stat, dest_stat)
+                    else:
+                        self.move_file(file_path, dest_file, source_stat)
+                        self.versions.observe(dest_file)
+                        self.logger.info(f"   ✓ Moved successfully")
+                        self.logger.info(f"   → {dest_path}")
+                        self.stats.increment("files_moved", file_category)
+            
+            except PermissionError as e:
+                self.logger.error(f"   ✗ Permission denied: {filename}")
+                self.stats.increment("errors")
+            except Exception as e:
+                self.logger.error(f"   ✗ Error organizing {filename}: {str(e)}")
+                self.stats.increment("errors")
+    
+    def scan_files(self):
+        """Yield DirEntry objects for files in the source folder
+        
+        Uses os.scandir so each entry's type and stat data come from the
+        directory listing. In recursive mode, subdirectories are walked
+        depth-first up to max_depth levels (0 = unlimited) and excluded
+        directories are pruned without being listed.
+        """
+        stack = [(self.source_folder, 0)]
+        while stack:
+            directory, depth = stack.pop()
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_file():
+                                yield entry
+                            elif (self.recursive and entry.is_dir(follow_symlinks=False)
+                                  and self.include_dir(entry.name, depth + 1)):
+                                stack.append((entry.path, depth + 1))
+                        except OSError:
+                            continue
+            except OSError as e:
+                self.logger.warning(f"⚠️  Cannot scan {directory}: {e}")
+    
+    def include_dir(self, dirname, depth):
+        """Check whether a subdirectory depth levels below the source is covered"""
+        if self.max_depth and depth > self.max_depth:
+            return False
+        return not self.rules.is_excluded_dir(dirname)
+    
+    def is_watched_path(self, path):
+        """Check that an event path lies in a directory this source covers"""
+        if not self.recursive:
+            return True
+        parts = Path(os.path.relpath(os.path.dirname(path), self.source_folder)).parts
+        if parts == (".",):
+            return True
+        if self.max_depth and len(parts) > self.max_depth:
+            return False
+        return not any(self.rules.is_excluded_dir(part) for part in parts)
+    
+    def on_created(self, event):
+        """Handle new file creation"""
+        with _METRICS.timer("event"):
+            if not event.is_directory:
+                filename = os.path.basename(event.src_path)
+                
+                if not self.should_exclude(filename) and self.is_watched_path(event.src_path):
+                    if not self.schedule_pending(event.src_path):
+                        return
+                    self.logger.info(f"\n⏱️  New file detected: {filename} ({self.name})")
+                    if self.readiness is not None:
+                        self.logger.info(f"   Will organize once stable (at most {self.delay_minutes} minutes)")
+                    else:
+                        self.logger.info(f"   Will organize in {self.delay_minutes} minutes")
+    
+    def on_modified(self, event):
+        """Handle file modification - reset timer"""
+        with _METRICS.timer("event"):
+            if event.is_directory or event.src_path not in self.pending_files:
+                return
+            
+            now = time.monotonic()
+            outcome = self.coalescer.event(event.src_path, now)
+            if outcome == EventCoalescer.COALESCED:
+                self.log_event_summary(now)
+                return
+            
+            self.schedule_pending(event.src_path)
+            if outcome == EventCoalescer.APPLY:
+                filename = os.path.basename(event.src_path)
+                self.logger.info(f"\n↻ File modified: {filename} ({self.name})")
+                self.logger.info(f"   Timer reset - {self.delay_minutes} minutes")
+            else:
+                self.log_event_summary(now)
+    
+    def log_event_summary(self, now):
+        """Periodically log how many repeat events were coalesced or not logged"""
+        count = self.coalescer.summary(now)
+        if count:
+            self.logger.info(f"↻ {count:,} repeated modify events in {self.name} "
+                             f"since the last summary ({self.coalescer.coalesced:,} coalesced in total)")
+    
+    def schedule_pending(self, file_path, changed_at=None):
+        """Start or reset the timer of a pending file
+        
+        changed_at is the monotonic time of the file's last change (default
+        now). Returns False when the file is left to the periodic rescan
+        instead: in rescan mode, or when tracking it would exceed the
+        high-water mark.
+        """
+        now = time.monotonic()
+        if changed_at is None:
+            changed_at = now
+        if file_path not in self.pending_files:
+            if self.rescan_mode:
+                return False
+            if self.high_water_mark and len(self.pending_files) >= self.high_water_mark:
+                self.enter_rescan_mode(now)
+                return False
+        
+        if self.readiness is not None:
+            self.readiness.touched(file_path, changed_at)
+            self.pending_files.schedule(file_path, changed_at + self.readiness.probe_interval)
+        else:
+            self.pending_files.schedule(file_path, changed_at + self.delay_minutes * 60)
+        return True
+    
+    def enter_rescan_mode(self, now):
+        """Stop tracking new files one by one and rescan the folder periodically"""
+        self.rescan_mode = True
+        self.next_rescan = now + self.rescan_interval
+        self.logger.warning(f"⚠️  {len(self.pending_files):,} files pending in {self.name} "
+                            f"(high-water mark {self.high_water_mark:,}): "
+                            f"rescanning every {self.rescan_interval}s instead of tracking events")
+        if self.pending_files.wakeup is not None:
+            self.pending_files.wakeup.set()
+    
+    def rescan(self, now):
+        """Collect quiet files from a folder scan while in rescan mode
+        
+        A file is ready once its mtime is older than the delay (or, with
+        adaptive readiness, its category's minimum age). At most
+        high_water_mark files are returned per scan. Rescan mode ends when
+        the pending queue has drained and fewer than low_water_mark files
+        are still waiting; those are then tracked as pending again.
+        """
+        wall_now = time.time()
+        ready = []
+        waiting = []
+        limit = self.high_water_mark or None
+        for entry in self.scan_files():
+            if self.should_exclude(entry.name) or entry.path in self.pending_files:
+                continue
+            try:
+                mtime = entry.stat().st_mtime
+            except OSError:
+                continue
+            
+            if self.readiness is not None:
+                category = self.get_file_type_category(_file_suffix(entry.name).lower())
+                quiet = self.readiness.category_min_age.get(category, self.readiness.min_age)
+            else:
+                quiet = self.delay_minutes * 60
+            
+            if wall_now - mtime < quiet:
+                waiting.append((entry.path, mtime))
+            elif limit is None or len(ready) < limit:
+                ready.append(entry.path)
+            else:
+                waiting.append((entry.path, mtime))
+        
+        if len(self.pending_files) == 0 and len(waiting) < self.low_water_mark:
+            self.rescan_mode = False
+            self.next_rescan = None
+            self.logger.info(f"✓ {self.name} caught up, tracking file events again")
+            # Their delay already started at their last change, not now
+            for file_path, mtime in waiting:
+                self.schedule_pending(file_path, now - max(0.0, wall_now - mtime))
+        else:
+            # Come back right away if the scan was capped
+            self.next_rescan = now if limit and len(ready) >= limit else now + self.rescan_interval
+        
+        if ready:
+            self.logger.info(f"\n🔄 Rescan of {self.name}: {len(ready):,} files ready, "
+                             f"{len(waiting):,} still waiting")
+        return ready
+    
+    def check_pending_files(self):
+        """Check pending files and organize if delay elapsed"""
+        for file_path in self.due_files(time.monotonic()):
+            self.organize_file(file_path)
+    
+    def due_files(self, now):
+        """Pop pending files whose delay elapsed (or that are stable) and return them
+        
+        Files that are due for a readiness probe but still changing are
+        rescheduled instead of returned.
+        """
+        ready = []
+        for file_path, deadline in self.pending_files.pop_due(now):
+            _METRICS.observe("pending_queue", now - deadline)
+            
+            # Apply the newest coalesced modify event, if it came after the last reset
+            latest = self.coalescer.take_latest(file_path)
+            if latest is not None:
+                if self.readiness is not None:
+                    self.readiness.touched(file_path, latest)
+                elif latest + self.delay_minutes * 60 > now:
+                    self.pending_files.schedule(file_path, latest + self.delay_minutes * 60)
+                    continue
+            
+            if not os.path.exists(file_path):
+                if self.readiness is not None:
+                    self.readiness.forget(file_path)
+                continue
+            
+            if self.readiness is not None:
+                deadline = self.readiness.last_change(file_path, now) + self.delay_minutes * 60
+                category = self.get_file_type_category(_file_suffix(os.path.basename(file_path)).lower())
+                if now < deadline:
+                    if not self.readiness.is_ready(file_path, category, now):
+                        self.pending_files.schedule(
+                            file_path, min(deadline, now + self.readiness.probe_interval)
+                        )
+                        continue
+                    self.logger.info(f"\n✓ File is stable: {os.path.basename(file_path)}")
+                else:
+                    self.logger.info(f"\n⏰ {self.delay_minutes} minutes elapsed!")
+                self.readiness.forget(file_path)
+            else:
+                self.logger.info(f"\n⏰ {self.delay_minutes} minutes elapsed!")
+            
+            ready.append(file_path)
+        
+        if self.rescan_mode and now >= self.next_rescan:
+            ready.extend(self.rescan(now))
+        return ready
+    
+    def next_deadline(self):
+        """Monotonic time at which the next pending file (or rescan) is due"""
+        deadline = self.pending_files.next_deadline()
+        if self.rescan_mode and (deadline is None or self.next_rescan < deadline):
+            return self.next_rescan
+        return deadline
+    
+    def plan_file(self, entry, plan):
+        """Resolve one scanned file into a plan operation without touching it"""
+        if self.should_exclude(entry.name):
+            return None
+        try:
+            if not entry.is_file():
+                return None
+            source_stat = entry.stat()
+        except OSError:
+            return None
+        
+        dest_path, file_category = self.get_destination_path(entry.path, source_stat)
+        dest_file = os.path.join(dest_path, entry.name)
+        operation = {
+            "source_name": self.name,
+            "source": entry.path,
+            "dest": dest_file,
+            "category": file_category,
+            "size": source_stat.st_size,
+            "mtime_ns": source_stat.st_mtime_ns,
+            "dest_size": None,
+            "dest_mtime_ns": None,
+            "existing": None
+        }
+        
+        existing = self.find_indexed_duplicate(entry.path, dest_file, source_stat.st_size)
+        if existing:
+            operation["action"] = "skip_indexed"
+            operation["existing"] = existing
+            return operation
+        
+        # Collision with a file moved earlier in this same plan; at apply time
+        # the destination is expected to be that file (moves keep size and mtime)
+        planned = plan.planned_source(dest_file)
+        if planned is not None:
+            operation["dest_size"] = planned["size"]
+            operation["dest_mtime_ns"] = planned["mtime_ns"]
+            if self.duplicates.are_identical(entry.path, planned["source"], source_stat):
+                operation["action"] = "skip_identical"
+            elif source_stat.st_mtime_ns > planned["mtime_ns"]:
+                operation["action"] = "replace"
+            else:
+                operation["action"] = "version"
+            return operation
+        
+        try:
+            dest_stat = os.stat(dest_file)
+        except FileNotFoundError:
+            operation["action"] = "move"
+            return operation
+        
+        operation["dest_size"] = dest_stat.st_size
+        operation["dest_mtime_ns"] = dest_stat.st_mtime_ns
+        operation["action"] = self.classify_duplicate(entry.path, dest_file, source_stat, dest_stat)
+        return operation
+    
+    def plan_existing_files(self, plan):
+        """Add an operation for every existing file to a MovePlan"""
+        if not os.path.exists(self.source_folder):
+            return plan
+        for entry in self.scan_files():
+            try:
+                operation = self.plan_file(entry, plan)
+            except Exception as e:
+                self.logger.error(f"   ✗ Error planning {entry.name}: {str(e)}")
+                continue
+            if operation is not None:
+                plan.add(operation)
+        return plan
+    
+    def apply_operation(self, operation):
+        """Execute one plan operation, re-deciding if anything changed since planning"""
+        source_file = operation["source"]
+        dest_file = operation["dest"]
+        try:
+            source_stat = os.stat(source_file)
+        except FileNotFoundError:
+            return False
+        
+        if (source_stat.st_size != operation["size"]
+                or source_stat.st_mtime_ns != operation["mtime_ns"]):
+            self.organize_file(source_file)
+            return True
+        
+        action = operation["action"]
+        filename = os.path.basename(source_file)
+        self.logger.info(f"\n📦 Processing: {filename}")
+        try:
+            with _dest_lock(dest_file):
+                try:
+                    dest_stat = os.stat(dest_file)
+                except FileNotFoundError:
+                    dest_stat = None
+                
+                if action == "skip_indexed" and os.path.exists(operation["existing"]):
+                    self.logger.info(f"   ✓ Identical file exists at {operation['existing']}, skipping: {filename}")
+                    self.remove_duplicate(source_file, operation["existing"])
+                    self.stats.increment("files_skipped")
+                elif dest_stat is None:
+                    self.destinations.ensure_dir(os.path.dirname(dest_file))
+                    self.move_file(source_file, dest_file, source_stat)
+                    self.versions.observe(dest_file)
+                    self.logger.info(f"   ✓ Moved successfully")
+                    self.stats.increment("files_moved", operation["category"])
+                elif (operation["dest_size"] == dest_stat.st_size
+                        and operation["dest_mtime_ns"] == dest_stat.st_mtime_ns
+                        and action in ("skip_identical", "replace", "version")):
+                    # Destination is what the plan expected (unchanged, or the file
+                    # this plan moved there first): trust the planned decision
+                    self.resolve_duplicate(action, source_file, dest_file, source_stat)
+                else:
+                    self.handle_duplicate(source_file, dest_file, source_stat, dest_stat)
+        except PermissionError:
+            self.logger.error(f"   ✗ Permission denied: {filename}")
+            self.stats.increment("errors")
+        except Exception as e:
+            self.logger.error(f"   ✗ Error organizing {filename}: {str(e)}")
+            self.stats.increment("errors")
+        return True
+    
+    def organize_existing_files(self, plan=None):
+        """Organize all existing files in source folder
+        
+        When a MovePlan is given, operations are only added to it and no
+        file is touched.
+        """
+        if plan is not None:
+            return self.plan_existing_files(plan)
+        
+        if not os.path.exists(self.source_folder):
+            return
+        
+        if self.config.settings.get("bulk", {}).get("parallel", False):
+            BulkOrganizer.from_settings([self], self.config.settings).run()
+            return
+        
+        self.logger.info(f"\n📂 Organizing existing files in {self.name}...")
+        count = 0
+        total_bytes = 0
+        start = time.perf_counter()
+        
+        for entry in self.scan_files():
+            try:
+                total_bytes += entry.stat().st_size
+            except OSError:
+                continue
+            self.organize_file(entry.path, entry)
+            count += 1
+        
+        self.logger.info(f"   ✓ Organized {count} existing files from {self.name}")
+        self.logger.info(f"   {format_throughput(count, total_bytes, time.perf_counter() - start)}\n")
+
+def format_throughput(count, total_bytes, elapsed):
+    """Format a files/s and MB/s summary"""
+    elapsed = max(elapsed, 1e-9)
+    return (f"⚡ {count:,} files, {total_bytes / 1048576:,.1f} MB in {elapsed:.2f}s "
+            f"({count / elapsed:,.1f} files/s, {total_bytes / 1048576 / elapsed:,.1f} MB/s)")
+
+# Parallel Bulk Organizer
+class BulkOrganizer:
+    """Organize existing files of several sources on per-device thread pools"""
+    
+    def __init__(self, handlers, workers_per_device=4, device_workers=None, queue_per_worker=4):
+        self.handlers = handlers
+        self.workers_per_device = max(1, workers_per_device)
+        self.device_workers = device_workers or {}
+        self.queue_per_worker = max(1, queue_per_worker)
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_bytes = 0
+    
+    @classmethod
+    def from_settings(cls, handlers, settings):
+        """Create a bulk organizer from the bulk section of a config"""
+        bulk_config = settings.get("bulk", {})
+        return cls(
+            handlers,
+            workers_per_device=bulk_config.get("workers_per_device", 4),
+            device_workers=bulk_config.get("device_workers", {})
+        )
+    
+    def device_key(self, handler):
+        """Identify the physical device behind a handler's destination drive"""
+        try:
+            return os.stat(handler.dest_base).st_dev
+        except OSError:
+            return os.path.normcase(handler.dest_base)
+    
+    def workers_for(self, handlers):
+        """Worker count configured for the drive of a handler group"""
+        for handler in handlers:
+            for drive, workers in self.device_workers.items():
+                if os.path.normcase(drive) == os.path.normcase(handler.dest_base):
+                    return max(1, workers)
+        return self.workers_per_device
+    
+    def _organize(self, handler, entry, size, slots):
+        try:
+            handler.organize_file(entry.path, entry)
+            with self._lock:
+                self.count += 1
+                self.total_bytes += size
+        finally:
+            slots.release()
+    
+    def _feed_device(self, handlers):
+        """Stream the files of every source on one device into its pool"""
+        workers = self.workers_for(handlers)
+        slots = threading.BoundedSemaphore(workers * self.queue_per_worker)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bulk") as pool:
+            for handler in handlers:
+                if not os.path.exists(handler.source_folder):
+                    continue
+                self.logger.info(f"\n📂 Organizing existing files in {handler.name} ({workers} workers)...")
+                for entry in handler.scan_files():
+                    try:
+                        size = entry.stat().st_size
+                    except OSError:
+                        continue
+                    slots.acquire()
+                    pool.submit(self._organize, handler, entry, size, slots)
+    
+    def run(self):
+        """Organize all sources, one pool per destination device"""
+        groups = {}
+        for handler in self.handlers:
+            groups.setdefault(self.device_key(handler), []).append(handler)
+        
+        start = time.perf_counter()
+        feeders = [
+            threading.Thread(target=self._feed_device, args=(group,), name="bulk-feeder")
+            for group in groups.values()
+        ]
+        for feeder in feeders:
+            feeder.start()
+        for feeder in feeders:
+            feeder.join()
+        elapsed = time.perf_counter() - start
+        
+        names = ", ".join(handler.name for handler in self.handlers)
+        self.logger.info(f"   ✓ Organized {self.count} existing files from {names}")
+        self.logger.info(f"   {format_throughput(self.count, self.total_bytes, elapsed)}\n")
+        return self.count, self.total_bytes, elapsed
+
+# Snapshot Polling
+_MOUNT_ESCAPE = re.compile(r"\\([0-7]{3})")
+
+def is_network_path(path, network_fs_types):
+    """Best-effort check whether a folder lives on a network mount"""
+    path = os.path.abspath(path)
+    if os.name == "nt":
+        if path.startswith("\\\\"):
+            return True
+        try:
+            import ctypes
+            drive = os.path.splitdrive(path)[0] + "\\"
+            return ctypes.windll.kernel32.GetDriveTypeW(drive) == 4  # DRIVE_REMOTE
+        except (ImportError, AttributeError, OSError):
+            return False
+    
+    # Longest mount point containing the path, from /proc/mounts
+    try:
+        with open("/proc/mounts", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return False
+    best, fs_type = "", ""
+    for line in lines:
+        fields = line.split()
+        if len(fields) < 3:
+            continue
+        mount_point = _MOUNT_ESCAPE.sub(lambda m: chr(int(m.group(1), 8)), fields[1])
+        prefix = mount_point.rstrip("/") + "/"
+        if (path == mount_point or path.startswith(prefix)) and len(mount_point) > len(best):
+            best, fs_type = mount_point, fields[2]
+    return fs_type in network_fs_types
+
+def resolve_watch_mode(mode, folder, network_fs_types):
+    """Return True when a source in this watch_mode should be polled"""
+    if mode == "poll":
+        return True
+    if mode == "auto":
+        return is_network_path(folder, network_fs_types)
+    return False
+
+class PollSnapshot:
+    """Compact listing of a source tree, diffed on every poll
+    
+    Each directory keeps its mtime, a tuple of file names, an array of
+    64-bit fingerprints of (size, mtime, inode) and its subdirectories.
+    Creating, deleting or renaming an entry updates the directory's mtime,
+    so directories whose mtime is unchanged are not listed again. Writes
+    to an existing file do not, so files that changed recently stay "hot"
+    and are stat'ed on their own each poll until they have been quiet for
+    hot_polls polls. A full scan every few polls catches anything else.
+    """
+    
+    # Windows listings carry no inode; os.stat does, so leave it out there
+    _USE_INODE = os.name != "nt"
+    
+    def __init__(self, root, recursive=False, include_dir=None, hot_polls=30):
+        self.root = root
+        self.recursive = recursive
+        self.include_dir = include_dir
+        self.hot_polls = hot_polls
+        self._dirs = {}
+        self._hot = {}
+        self.polls = 0
+        self.listed = 0
+    
+    @classmethod
+    def _fingerprint(cls, st):
+        return hash((st.st_size, st.st_mtime_ns, st.st_ino if cls._USE_INODE else 0))
+    
+    def __len__(self):
+        return sum(len(state[1]) for state in self._dirs.values())
+    
+    def _list(self, directory, depth):
+        names = []
+        prints = array.array("q")
+        subdirs = []
+        with os.scandir(directory) as it:
+            for entry in it:
+                try:
+                    if entry.is_file():
+                        prints.append(self._fingerprint(entry.stat()))
+                        names.append(entry.name)
+                    elif (self.recursive and entry.is_dir(follow_symlinks=False)
+                          and (self.include_dir is None or self.include_dir(entry.name, depth + 1))):
+                        subdirs.append(entry.path)
+                except OSError:
+                    continue
+        return tuple(names), prints, tuple(subdirs)
+    
+    def _check_hot(self, events):
+        for path, hot in list(self._hot.items()):
+            try:
+                fingerprint = self._fingerprint(os.stat(path))
+            except OSError:
+                # Gone; the directory listing reports the deletion
+                del self._hot[path]
+                continue
+            if fingerprint != hot[0]:
+                hot[0] = fingerprint
+                hot[1] = 0
+                events.append(FileModifiedEvent(path))
+            else:
+                hot[1] += 1
+                if hot[1] >= self.hot_polls:
+                    del self._hot[path]
+    
+    def poll(self, stop_event=None, full_scan_every=0):
+        """Return the file events since the last poll (none on the first)
+        
+        Returns an empty list if stop_event is set during the walk.
+        """
+        report = self.polls > 0
+        full = bool(full_scan_every) and self.polls % full_scan_every == 0
+        self.polls += 1
+        self.listed = 0
+        events = []
+        if report:
+            self._check_hot(events)
+        
+        seen = set()
+        stack = [(self.root, 0)]
+        while stack:
+            if stop_event is not None and stop_event.is_set():
+                return []
+            directory, depth = stack.pop()
+            try:
+                dir_mtime = os.stat(directory).st_mtime_ns
+                state = self._dirs.get(directory)
+                if state is not None and state[0] == dir_mtime and not full:
+                    seen.add(directory)
+                    stack.extend((subdir, depth + 1) for subdir in state[3])
+                    continue
+                names, prints, subdirs = self._list(directory, depth)
+            except OSError:
+                continue
+            seen.add(directory)
+            self._dirs[directory] = (dir_mtime, names, prints, subdirs)
+            self.listed += 1
+            stack.extend((subdir, depth + 1) for subdir in subdirs)
+            if not report:
+                continue
+            
+            previous = dict(zip(state[1], state[2])) if state is not None else {}
+            for name, fingerprint in zip(names, prints):
+                old = previous.pop(name, None)
+                if old == fingerprint:
+                    continue
+                path = os.path.join(directory, name)
+                hot = self._hot.get(path)
+                if hot is not None and hot[0] == fingerprint:
+                    continue
+                events.append(FileCreatedEvent(path) if old is None else FileModifiedEvent(path))
+                self._hot[path] = [fingerprint, 0]
+            for name in previous:
+                path = os.path.join(directory, name)
+                self._hot.pop(path, None)
+                events.append(FileDeletedEvent(path))
+        
+        # Directories that were removed (or are now excluded)
+        for directory in [d for d in self._dirs if d not in seen]:
+            state = self._dirs.pop(directory)
+            if report:
+                events.extend(FileDeletedEvent(os.path.join(directory, name)) for name in state[1])
+        return events
+
+class SnapshotObserver:
+    """Polling stand-in for a watchdog Observer, for network shares
+    
+    Network file systems (SMB, NFS) do not deliver change notifications.
+    One thread polls every scheduled folder each interval_seconds and
+    passes the differences to the event handler as watchdog events, so
+    they go through the same pending pipeline as native events. Unlike
+    watchdog's polling observer, unchanged directories are not listed and
+    excluded directories are never entered.
+    """
+    
+    def __init__(self, interval_seconds=10, full_scan_every=30):
+        self.interval = interval_seconds
+        self.full_scan_every = full_scan_every
+        self._watches = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+        self.logger = logging.getLogger(__name__)
+    
+    @classmethod
+    def from_settings(cls, settings):
+        """Create a poller from the polling section of a config"""
+        polling_config = settings.get("polling", {})
+        return cls(
+            interval_seconds=polling_config.get("interval_seconds", 10),
+            full_scan_every=polling_config.get("full_scan_every", 30)
+        )
+    
+    def schedule(self, event_handler, path, recursive=False, include_dir=None):
+        """Start polling a folder; returns the watch to pass to unschedule"""
+        snapshot = PollSnapshot(path, recursive, include_dir, hot_polls=self.full_scan_every or 30)
+        with self._lock:
+            self._watches[snapshot] = event_handler
+        # Take the initial snapshot now rather than one interval from now
+        self._wake.set()
+        return snapshot
+    
+    def unschedule(self, watch):
+        with self._lock:
+            self._watches.pop(watch, None)
+    
+    def start(self):
+        """Start the polling thread (does nothing if it is running)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="poller", daemon=True)
+            self._thread.start()
+    
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            with self._lock:
+                watches = list(self._watches.items())
+            for snapshot, event_handler in watches:
+                try:
+                    with _METRICS.timer("poll"):
+                        events = snapshot.poll(self._stop, self.full_scan_every)
+                except Exception as e:
+                    self.logger.error(f"Error polling {snapshot.root}: {e}")
+                    continue
+                for event in events:
+                    if snapshot not in self._watches:
+                        break
+                    try:
+                        event_handler.dispatch(event)
+                    except Exception as e:
+                        self.logger.error(f"Error handling event for {event.src_path}: {e}")
+            self._wake.wait(self.interval)
+    
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+    
+    def join(self):
+        if self._thread is not None:
+            self._thread.join()
+
+def watch_source(observer, poller, event_handler, handler):
+    """Schedule a handler's folder natively or on the poller; returns (observer, watch)"""
+    if handler.polling:
+        return poller, poller.schedule(event_handler, handler.source_folder,
+                                       recursive=handler.recursive, include_dir=handler.include_dir)
+    return observer, observer.schedule(event_handler, handler.source_folder, recursive=handler.recursive)
+
+# Shared Event Dispatcher
+class _QueueingEventHandler(FileSystemEventHandler):
+    """Observer callback that only tags events with their watch root and enqueues them"""
+    
+    def __init__(self, dispatcher, root):
+        self.dispatcher = dispatcher
+        self.root = root
+    
+    def dispatch(self, event):
+        self.dispatcher.enqueue(self.root, event)
+
+class EventDispatcher:
+    """One observer and one set of event queues shared by every source
+    
+    The observer thread does no filtering or logging: it appends
+    (timestamp, watch root, event) to a queue.SimpleQueue (lock-free on
+    the put side) and returns. Worker threads route each event to the
+    handler registered for its watch root. Events are sharded by path so
+    every path is always handled by the same worker, in order.
+    """
+    
+    def __init__(self, workers=2, poller=None):
+        self.observer = Observer()
+        self.poller = poller or SnapshotObserver()
+        self.routes = {}
+        self.watches = {}
+        self.queues = [queue.SimpleQueue() for _ in range(max(1, workers))]
+        self.threads = []
+        self.logger = logging.getLogger(__name__)
+        
+        # Metrics
+        self._metrics_lock = threading.Lock()
+        self.dispatched = 0
+        self.max_queue_depth = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+    
+    def add(self, handler):
+        """Register a handler under its source folder"""
+        self.routes[handler.source_folder] = handler
+        self.watches[handler.source_folder] = watch_source(
+            self.observer, self.poller, _QueueingEventHandler(self, handler.source_folder), handler
+        )
+    
+    def remove(self, handler):
+        """Stop watching a handler's source folder (works while running)"""
+        scheduled = self.watches.pop(handler.source_folder, None)
+        if scheduled is not None:
+            observer, watch = scheduled
+            observer.unschedule(watch)
+        self.routes.pop(handler.source_folder, None)
+    
+    def enqueue(self, root, event):
+        """Called on the observer thread"""
+        shard = hash(event.src_path) % len(self.queues)
+        self.queues[shard].put((time.monotonic(), root, event))
+    
+    def queue_depth(self):
+        """Events waiting across all queues"""
+        return sum(q.qsize() for q in self.queues)
+    
+    def _work(self, events):
+        while True:
+            item = events.get()
+            if item is None:
+                return
+            queued_at, root, event = item
+            depth = events.qsize()
+            handler = self.routes.get(root)
+            if handler is not None:
+                try:
+                    handler.dispatch(event)
+                except Exception as e:
+                    self.logger.error(f"Error handling event for {event.src_path}: {e}")
+            latency = time.monotonic() - queued_at
+            _METRICS.observe("dispatch_queue", latency)
+            with self._metrics_lock:
+                self.dispatched += 1
+                self.total_latency += latency
+                if latency > self.max_latency:
+                    self.max_latency = latency
+                if depth > self.max_queue_depth:
+                    self.max_queue_depth = depth
+    
+    def start(self):
+        """Start the observer and the dispatch workers"""
+        for i, events in enumerate(self.queues):
+            thread = threading.Thread(
+                target=self._work, args=(events,), name=f"dispatch-{i}", daemon=True
+            )
+            thread.start()
+            self.threads.append(thread)
+        self.observer.start()
+        self.poller.start()
+    
+    def stop(self):
+        """Stop watching; queued events are still drained"""
+        self.observer.stop()
+        self.poller.stop()
+    
+    def join(self):
+        """Wait for the observer and drain the workers"""
+        self.observer.join()
+        self.poller.join()
+        for events in self.queues:
+            events.put(None)
+        for thread in self.threads:
+            thread.join()
+    
+    def metrics(self):
+        """Event queue depth and dispatch latency"""
+        with self._metrics_lock:
+            avg = self.total_latency / self.dispatched if self.dispatched else 0.0
+            return {
+                "events_dispatched": self.dispatched,
+                "queue_depth": self.queue_depth(),
+                "max_queue_depth": self.max_queue_depth,
+                "avg_dispatch_latency_ms": avg * 1000,
+                "max_dispatch_latency_ms": self.max_latency * 1000
+            }
+
+class ObserverSet:
+    """One observer per source, started and stopped individually
+    
+    Polled sources share a single poller thread instead.
+    """
+    
+    def __init__(self, poller=None):
+        self.observers = {}
+        self.poller = poller or SnapshotObserver()
+    
+    def add(self, handler):
+        """Start watching a handler's source folder"""
+        if handler.polling:
+            self.poller.start()
+            self.observers[handler.name] = watch_source(None, self.poller, handler, handler)
+            return
+        observer = Observer()
+        observer.schedule(handler, handler.source_folder, recursive=handler.recursive)
+        observer.start()
+        self.observers[handler.name] = (observer, None)
+    
+    def remove(self, handler):
+        """Stop watching a handler's source folder"""
+        scheduled = self.observers.pop(handler.name, None)
+        if scheduled is None:
+            return
+        observer, watch = scheduled
+        if watch is not None:
+            observer.unschedule(watch)
+        else:
+            observer.stop()
+            observer.join()
+    
+    def stop(self):
+        for observer, watch in self.observers.values():
+            if watch is None:
+                observer.stop()
+        self.poller.stop()
+    
+    def join(self):
+        for observer, watch in self.observers.values():
+            if watch is None:
+                observer.join()
+        self.poller.join()
+
+# Batch Planner
+class MovePlan:
+    """Serializable list of move decisions for a plan/apply run"""
+    
+    ACTIONS = ("move", "replace", "version", "skip_identical", "skip_indexed")
+    
+    def __init__(self, operations=None, created=None):
+        self.operations = operations or []
+        self.created = created or datetime.now().isoformat()
+        self._planned = {}
+        for operation in self.operations:
+            self._remember(operation)
+    
+    def _remember(self, operation):
+        # The last move or replace into a path is what later operations meet there
+        if operation["action"] in ("move", "replace"):
+            self._planned[os.path.normcase(operation["dest"])] = operation
+    
+    def add(self, operation):
+        """Append an operation"""
+        self.operations.append(operation)
+        self._remember(operation)
+    
+    def planned_source(self, dest_file):
+        """Operation already planned to write dest_file, if any"""
+        return self._planned.get(os.path.normcase(dest_file))
+    
+    def summary(self):
+        """Counts per action, total bytes and destination folders"""
+        counts = {action: 0 for action in self.ACTIONS}
+        for operation in self.operations:
+            counts[operation["action"]] = counts.get(operation["action"], 0) + 1
+        return {
+            "operations": len(self.operations),
+            "bytes": sum(operation["size"] for operation in self.operations),
+            "destination_folders": len({os.path.dirname(op["dest"]) for op in self.operations}),
+            "actions": counts
+        }
+    
+    def grouped(self):
+        """Operations grouped by destination folder, folders in sorted order
+        
+        Within a folder, operations are sorted by file name. The sort is
+        stable, so operations on the same name keep plan order and a
+        planned move always runs before the versions or skips that collide
+        with it.
+        """
+        groups = {}
+        for operation in self.operations:
+            groups.setdefault(os.path.dirname(operation["dest"]), []).append(operation)
+        for dest_dir in sorted(groups):
+            yield dest_dir, sorted(groups[dest_dir], key=lambda op: os.path.basename(op["dest"]))
+    
+    def to_dict(self):
+        return {
+            "version": __version__,
+            "created": self.created,
+            "summary": self.summary(),
+            "operations": self.operations
+        }
+    
+    def save(self, path):
+        """Write the plan as JSON"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+    
+    @classmethod
+    def load(cls, path):
+        """Read a plan written by save()"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data.get("operations", []), data.get("created"))
+
+def build_plan(handlers):
+    """Walk every source and resolve all decisions into a MovePlan"""
+    plan = MovePlan()
+    for handler in handlers:
+        handler.organize_existing_files(plan=plan)
+    return plan
+
+def print_plan(plan, show_operations=True):
+    """Print a plan summary and, optionally, every operation"""
+    summary = plan.summary()
+    print("\n📋 Move plan")
+    if show_operations:
+        for _, operations in plan.grouped():
+            for operation in operations:
+                target = operation["existing"] or operation["dest"]
+                print(f"   {operation['action']:15} {operation['source']}")
+                print(f"   {'':15} → {target}")
+    print(f"\n   Operations:          {summary['operations']:,}")
+    print(f"   Data:                {summary['bytes'] / 1048576:,.1f} MB")
+    print(f"   Destination folders: {summary['destination_folders']:,}")
+    for action, count in summary["actions"].items():
+        print(f"   {action:20} {count:,}")
+    print()
+
+def apply_plan(plan, handlers):
+    """Execute a plan grouped and sorted by destination folder"""
+    logger = logging.getLogger(__name__)
+    by_name = {handler.name: handler for handler in handlers}
+    count = 0
+    total_bytes = 0
+    start = time.perf_counter()
+    
+    for dest_dir, operations in plan.grouped():
+        # One directory at a time; it is created by the first move into it
+        for operation in operations:
+            handler = by_name.get(operation["source_name"])
+            if handler is None:
+                logger.warning(f"⚠️  Unknown source '{operation['source_name']}' in plan, skipping")
+                continue
+            if handler.apply_operation(operation):
+                count += 1
+                total_bytes += operation["size"]
+    
+    logger.info(f"   ✓ Applied {count:,} planned operations")
+    logger.info(f"   {format_throughput(count, total_bytes, time.perf_counter() - start)}\n")
+    return count
+
+def runtime_metric_lines(statistics, handlers, dispatcher=None):
+    """Prometheus lines for totals, pending files and the event queue"""
+    lines = [
+        "# HELP organizer_files_total Files handled, by outcome",
+        "# TYPE organizer_files_total counter"
+    ]
+    for action, count in statistics.get_summary().items():
+        lines.append(f'organizer_files_total{{action="{action}"}} {count}')
+    lines.append("# HELP organizer_pending_files Files waiting to be organized")
+    lines.append("# TYPE organizer_pending_files gauge")
+    for handler in handlers:
+        lines.append(f'organizer_pending_files{{source="{handler.name}"}} {len(handler.pending_files)}')
+    lines.append("# HELP organizer_rescan_mode 1 while a source is in periodic rescan mode")
+    lines.append("# TYPE organizer_rescan_mode gauge")
+    for handler in handlers:
+        lines.append(f'organizer_rescan_mode{{source="{handler.name}"}} {int(handler.rescan_mode)}')
+    if dispatcher is not None:
+        lines.append("# HELP organizer_event_queue_depth Events waiting for a dispatch worker")
+        lines.append("# TYPE organizer_event_queue_depth gauge")
+        lines.append(f"organizer_event_queue_depth {dispatcher.queue_depth()}")
+    return lines
+
+def run_pending_loop(handlers, wakeup, check_interval, stop_event=None, reloader=None):
+    """Organize pending files as they come due
+    
+    Sleeps until the next deadline or a new event; check_interval only
+    bounds the idle wait so Ctrl+C stays responsive. Runs until stop_event
+    is set (or forever when none is given). Config reloads requested by
+    reloader are applied here, between ticks.
+    """
+    while stop_event is None or not stop_event.is_set():
+        wakeup.clear()
+        if reloader is not None and reloader.requested:
+            reloader.apply()
+        for handler in handlers:
+            handler.check_pending_files()
+        
+        deadlines = [d for d in (handler.next_deadline() for handler in handlers) if d is not None]
+        timeout = check_interval
+        if deadlines:
+            timeout = min(timeout, max(0.0, min(deadlines) - time.monotonic()))
+        wakeup.wait(timeout)
+
+# Asyncio Runtime
+class _AsyncEventBridge(FileSystemEventHandler):
+    """Observer callback that hands events to the event loop"""
+    
+    def __init__(self, runtime, root):
+        self.runtime = runtime
+        self.root = root
+    
+    def dispatch(self, event):
+        self.runtime.loop.call_soon_threadsafe(
+            self.runtime.events.put_nowait, (time.monotonic(), self.root, event)
+        )
+
+class AsyncRuntime:
+    """Event-loop alternative to the observer threads plus run_pending_loop
+    
+    Watchdog events are bridged into an asyncio.Queue and applied to the
+    handlers on the loop thread. A single loop timer is armed for the
+    earliest deadline; nothing runs while nothing is due. Due files are
+    collected (popped, stat'ed and probed) on a bounded thread pool while
+    the loop keeps applying events, so the pending queue is used from both
+    and relies on its own lock. Moves go to the same pool, and at most
+    max_in_flight organize jobs are outstanding: at that limit, files
+    already popped wait for a free slot and no more are collected until
+    they are submitted. On SIGINT/SIGTERM (or stop()) watching stops and in-flight moves are
+    finished before run() returns.
+    """
+    
+    def __init__(self, handlers, max_workers=4, max_in_flight=16, reloader=None, poller=None):
+        self.handlers = handlers
+        self.routes = {}
+        self.watches = {}
+        self.reloader = reloader
+        self.observer = None
+        self.poller = poller or SnapshotObserver()
+        self.max_workers = max(1, max_workers)
+        self.max_in_flight = max(1, max_in_flight)
+        self.logger = logging.getLogger(__name__)
+        self.loop = None
+        self.events = None
+        self._stop = None
+        self._due = None
+        self._timer = None
+        self._timer_at = None
+        self._in_flight = set()
+        self.organized = 0
+    
+    @classmethod
+    def from_settings(cls, handlers, settings, reloader=None):
+        """Create a runtime from the runtime section of a config"""
+        runtime_config = settings.get("runtime", {})
+        return cls(
+            handlers,
+            max_workers=runtime_config.get("max_workers", 4),
+            max_in_flight=runtime_config.get("max_in_flight", 16),
+            reloader=reloader,
+            poller=SnapshotObserver.from_settings(settings)
+        )
+    
+    def add(self, handler):
+        """Start routing events for a handler (on the loop thread once running)"""
+        self.routes[handler.source_folder] = handler
+        if self.observer is not None:
+            self.watches[handler.source_folder] = watch_source(
+                self.observer, self.poller, _AsyncEventBridge(self, handler.source_folder), handler
+            )
+    
+    def remove(self, handler):
+        """Stop routing events for a handler"""
+        scheduled = self.watches.pop(handler.source_folder, None)
+        if scheduled is not None:
+            observer, watch = scheduled
+            observer.unschedule(watch)
+        self.routes.pop(handler.source_folder, None)
+    
+    def run(self, install_signals=True):
+        """Run until stopped; blocks the calling thread"""
+        asyncio.run(self._main(install_signals))
+    
+    def stop(self):
+        """Request a clean shutdown (safe from any thread)"""
+        if self.loop is not None and self._stop is not None:
+            self.loop.call_soon_threadsafe(self._stop.set)
+    
+    def _install_signals(self):
+        for name in ("SIGINT", "SIGTERM", "SIGBREAK"):
+            signum = getattr(signal, name, None)
+            if signum is None:
+                continue
+            try:
+                self.loop.add_signal_handler(signum, self._stop.set)
+            except (NotImplementedError, RuntimeError):
+                # Windows event loops: plain handler that wakes the loop
+                signal.signal(signum, lambda *_: self.loop.call_soon_threadsafe(self._stop.set))
+    
+    def _arm_timer(self):
+        """Make sure a timer fires at the earliest pending deadline"""
+        deadlines = [d for d in (h.next_deadline() for h in self.handlers) if d is not None]
+        if not deadlines:
+            return
+        deadline = min(deadlines)
+        if self._timer is not None:
+            if self._timer_at <= deadline:
+                return
+            self._timer.cancel()
+        self._timer_at = deadline
+        # loop.time() is time.monotonic(), the clock the deadlines use
+        self._timer = self.loop.call_at(deadline, self._on_timer)
+    
+    def _on_timer(self):
+        self._timer = None
+        self._due.set()
+    
+    async def _consume_events(self):
+        while True:
+            queued_at, root, event = await self.events.get()
+            _METRICS.observe("dispatch_queue", time.monotonic() - queued_at)
+            handler = self.routes.get(root)
+            if handler is None:
+                continue
+            try:
+                handler.dispatch(event)
+            except Exception as e:
+                self.logger.error(f"Error handling event for {event.src_path}: {e}")
+            self._arm_timer()
+    
+    async def _organize_due(self, executor):
+        slots = asyncio.Semaphore(self.max_in_flight)
+        
+        def finished(future):
+            self._in_flight.discard(future)
+            slots.release()
+        
+        while True:
+            await self._due.wait()
+            self._due.clear()
+            if self._stop.is_set():
+                return
+            if self.reloader is not None and self.reloader.requested:
+                self.reloader.apply()
+            # Files popped here are always submitted, even if a stop arrives meanwhile
+            for handler in self.handlers:
+                ready = await self.loop.run_in_executor(executor, handler.due_files, time.monotonic())
+                for file_path in ready:
+                    await slots.acquire()
+                    future = self.loop.run_in_executor(executor, handler.organize_file, file_path)
+                    self._in_flight.add(future)
+                    future.add_done_callback(finished)
+                    self.organized += 1
+            self._arm_timer()
+    
+    async def _main(self, install_signals):
+        self.loop = asyncio.get_running_loop()
+        self.events = asyncio.Queue()
+        self._stop = asyncio.Event()
+        self._due = asyncio.Event()
+        if install_signals:
+            self._install_signals()
+        
+        observer = self.observer = Observer()
+        for handler in self.handlers:
+            self.add(handler)
+        if self.reloader is not None:
+            self.reloader.on_request = lambda: self.loop.call_soon_threadsafe(self._due.set)
+        
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="organize")
+        observer.start()
+        self.poller.start()
+        consumer = asyncio.ensure_future(self._consume_events())
+        organizer = asyncio.ensure_future(self._organize_due(executor))
+        self._arm_timer()
+        try:
+            await self._stop.wait()
+        finally:
+            self._stop.set()
+            observer.stop()
+            self.poller.stop()
+            await self.loop.run_in_executor(None, observer.join)
+            await self.loop.run_in_executor(None, self.poller.join)
+            consumer.cancel()
+            if self._timer is not None:
+                self._timer.cancel()
+            self._due.set()
+            await asyncio.gather(consumer, organizer, return_exceptions=True)
+            if self._in_flight:
+                self.logger.info(f"⏳ Finishing {len(self._in_flight)} in-flight moves...")
+                await asyncio.gather(*self._in_flight, return_exceptions=True)
+            executor.shutdown(wait=True)
+
+# Config Reloader
+class _ConfigFileWatcher(FileSystemEventHandler):
+    """Observer callback that flags a reload when config.json changes"""
+    
+    def __init__(self, reloader):
+        self.reloader = reloader
+    
+    def dispatch(self, event):
+        # Editors often save by writing a temp file and renaming it over the original
+        for path in (event.src_path, getattr(event, "dest_path", None)):
+            if path and os.path.abspath(path) == self.reloader.config_path:
+                self.reloader.request()
+                return
+
+class ConfigReloader:
+    """Apply changes to config.json without restarting
+    
+    The file watcher only flags a reload. apply() runs on the thread that
+    owns the handlers (the pending loop or the asyncio runtime), validates
+    the new file, swaps fresh settings into running handlers and starts or
+    stops watching sources that were added, removed or moved. Pending
+    timers of sources that stay are kept. An invalid file is reported and
+    the running configuration stays in effect.
+    """
+    
+    RESTART_SECTIONS = ("runtime", "metrics", "statistics", "index", "journal")
+    RESTART_EVENT_KEYS = ("shared_observer", "dispatch_workers")
+    
+    def __init__(self, config, handlers, watchers, create_handler, on_request=None):
+        self.config = config
+        self.handlers = handlers
+        self.watchers = watchers
+        self.create_handler = create_handler
+        self.on_request = on_request
+        self.config_path = os.path.abspath(config.config_file)
+        self.requested = False
+        self.logger = logging.getLogger(__name__)
+        self._observer = None
+        self._last_text = self._read_text()
+    
+    def _read_text(self):
+        try:
+            with open(self.config_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+    
+    def start(self):
+        """Watch the folder that holds config.json"""
+        self._observer = Observer()
+        self._observer.schedule(_ConfigFileWatcher(self), os.path.dirname(self.config_path))
+        self._observer.start()
+    
+    def stop(self):
+        if self._observer is not None:
+            self._observer.stop()
+    
+    def join(self):
+        if self._observer is not None:
+            self._observer.join()
+    
+    def request(self):
+        """Ask the owning loop to reload (called on the watcher thread)"""
+        self.requested = True
+        if self.on_request is not None:
+            self.on_request()
+    
+    def apply(self):
+        """Reload config.json if its content changed; returns True when applied"""
+        self.requested = False
+        text = self._read_text()
+        # An empty file is an editor mid-save; the write that follows triggers another event
+        if not text or not text.strip() or text == self._last_text:
+            return False
+        self._last_text = text
+        
+        try:
+            settings = self.config.read_config()
+        except ValueError as e:
+            self.logger.warning(f"⚠️  Config not reloaded, keeping the running settings: {e}")
+            return False
+        
+        old = self.config.settings
+        restart = [section for section in self.RESTART_SECTIONS if old.get(section) != settings.get(section)]
+        restart.extend(
+            f"events.{key}" for key in self.RESTART_EVENT_KEYS
+            if old["events"].get(key) != settings["events"].get(key)
+        )
+        self.config.settings = settings
+        
+        if settings["logging"] != old["logging"]:
+            setup_logging(self.config)
+        
+        polling_config = settings.get("polling", {})
+        self.watchers.poller.interval = polling_config.get("interval_seconds", 10)
+        self.watchers.poller.full_scan_every = polling_config.get("full_scan_every", 30)
+        
+        wanted = {s["name"]: s for s in settings["sources"] if s.get("enabled", True)}
+        added, removed, updated = [], [], 0
+        
+        for handler in list(self.handlers):
+            source_config = wanted.get(handler.name)
+            if (source_config is not None
+                    and str(Path.home() / source_config["folder"]) == handler.source_folder):
+                continue
+            self.watchers.remove(handler)
+            self.handlers.remove(handler)
+            removed.append(handler.name)
+            if len(handler.pending_files):
+                self.logger.info(f"   {len(handler.pending_files):,} pending files of {handler.name} "
+                                 f"are left in place")
+        
+        running = {handler.name: handler for handler in self.handlers}
+        for name, source_config in wanted.items():
+            handler = running.get(name)
+            if handler is None:
+                handler = self.create_handler(source_config)
+                if handler is None:
+                    continue
+                self.watchers.add(handler)
+                self.handlers.append(handler)
+                added.append(name)
+                continue
+            
+            watched_as = (handler.recursive, handler.polling)
+            handler.apply_settings(settings, source_config)
+            if (handler.recursive, handler.polling) != watched_as:
+                self.watchers.remove(handler)
+                self.watchers.add(handler)
+            updated += 1
+        
+        if (settings.get("duplicates") != old.get("duplicates")
+                or settings.get("hashing") != old.get("hashing")):
+            HashService.retire_unused(settings)
+        
+        self.logger.info(f"🔄 Configuration reloaded: {updated} sources updated"
+                         + (f", added: {', '.join(added)}" if added else "")
+                         + (f", removed: {', '.join(removed)}" if removed else ""))
+        if restart:
+            self.logger.warning(f"⚠️  Restart needed to apply changes to: {', '.join(restart)}")
+        return True
+
+# Logging
+class JsonLinesFormatter(logging.Formatter):
+    """One compact JSON object per record: time, level, thread and message"""
+    
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "thread": record.threadName,
+            "msg": record.getMessage().strip()
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+class _BatchFlushMixin:
+    """Handler whose flushes are deferred while the log listener writes a batch"""
+    
+    _batching = False
+    
+    def flush(self):
+        if not self._batching:
+            super().flush()
+
+class BatchStreamHandler(_BatchFlushMixin, logging.StreamHandler):
+    pass
+
+class BatchFileHandler(_BatchFlushMixin, logging.FileHandler):
+    pass
+
+class BatchRotatingFileHandler(_BatchFlushMixin, logging.handlers.RotatingFileHandler):
+    pass
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that only enqueues; formatting and I/O happen on the listener thread
+    
+    When max_size records are waiting, new records are dropped (and
+    counted) or the caller blocks until there is room, depending on the
+    policy. The drop policy uses a lock-free SimpleQueue, so the bound is
+    approximate under contention.
+    """
+    
+    def __init__(self, max_size=10000, block=False):
+        super().__init__(queue.Queue(maxsize=max_size) if block else queue.SimpleQueue())
+        self.max_size = max_size
+        self.block = block
+        self.dropped = 0
+    
+    def prepare(self, record):
+        # The listener lives in this process, so the record can be passed as is;
+        # only resolve the message so later changes to args can't leak in
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+    
+    def enqueue(self, record):
+        if self.block:
+            self.queue.put(record)
+        elif self.queue.qsize() < self.max_size:
+            self.queue.put(record)
+        else:
+            self.dropped += 1
+
+class LogListener:
+    """Drain the log queue on a background thread, writing records in batches
+    
+    After each batch the listener sleeps for flush_interval seconds and then
+    writes everything that arrived in one go, flushing handlers once per
+    batch. Waking for every record would make it contend with the organizer
+    threads for the GIL after each of their file system calls.
+    """
+    
+    def __init__(self, log_queue, handlers, flush_interval=0.1, batch_size=10000):
+        self.queue = log_queue
+        self.handlers = handlers
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._stopping = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="log-listener", daemon=True)
+        self._thread.start()
+    
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+            
+            stop = False
+            for handler in self.handlers:
+                handler._batching = True
+            for record in batch:
+                if record is None:
+                    stop = True
+                    continue
+                for handler in self.handlers:
+                    if record.levelno >= handler.level:
+                        handler.handle(record)
+            for handler in self.handlers:
+                handler._batching = False
+                handler.flush()
+            if stop:
+                return
+            self._stopping.wait(self.flush_interval)
+    
+    def stop(self):
+        """Write everything still queued and stop the thread"""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self.queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+_LOG_LISTENER = None
+
+def stop_logging():
+    """Flush and stop the background log listener, if one is running"""
+    global _LOG_LISTENER
+    if _LOG_LISTENER is None:
+        return
+    listener, queue_handler = _LOG_LISTENER
+    _LOG_LISTENER = None
+    logging.getLogger().removeHandler(queue_handler)
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+    if queue_handler.dropped:
+        print(f"⚠️  {queue_handler.dropped:,} log records dropped (log queue full)", file=sys.stderr)
+
+def setup_logging(config):
+    """Setup logging system
+    
+    With logging.queue enabled, the hot path only enqueues records and a
+    background listener writes them to the console and log file.
+    """
+    log_config = config.settings["logging"]
+    
+    # Log level
+    log_level = getattr(logging, log_config.get("log_level", "INFO"))
+    
+    # Format
+    log_format = '%(asctime)s - %(levelname)s - %(message)s'
+    date_format = '%Y-%m-%d %H:%M:%S'
+    text_formatter = logging.Formatter(log_format, date_format)
+    
+    # Handlers
+    handlers = []
+    
+    if log_config.get("console_output", True):
+        console = BatchStreamHandler(sys.stdout)
+        console.setFormatter(text_formatter)
+        handlers.append(console)
+    
+    if log_config.get("log_to_file", False):
+        log_file = log_config.get("log_file", "file_organizer.log")
+        max_bytes = log_config.get("max_bytes", 0)
+        if max_bytes:
+            file_handler = BatchRotatingFileHandler(
+                log_file, maxBytes=max_bytes,
+                backupCount=log_config.get("backup_count", 5), encoding='utf-8'
+            )
+        else:
+            file_handler = BatchFileHandler(log_file, encoding='utf-8')
+        if log_config.get("format", "text") == "json":
+            file_handler.setFormatter(JsonLinesFormatter())
+        else:
+            file_handler.setFormatter(text_formatter)
+        handlers.append(file_handler)
+    
+    # Replace whatever was configured before (safe to call again)
+    stop_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.setLevel(log_level)
+    
+    if log_config.get("queue", False):
+        global _LOG_LISTENER
+        queue_handler = BoundedQueueHandler(
+            max_size=log_config.get("queue_size", 10000),
+            block=log_config.get("queue_full_policy", "drop") == "block"
+        )
+        listener = LogListener(
+            queue_handler.queue, handlers,
+            flush_interval=log_config.get("flush_interval_seconds", 0.1)
+        )
+        listener.start()
+        root.addHandler(queue_handler)
+        _LOG_LISTENER = (listener, queue_handler)
+    else:
+        for handler in handlers:
+            root.addHandler(handler)
+
+def print_header():
+    """Print application header"""
+    print("\n" + "=" * 80)
+    print("  🚀 WINDOWS FILE ORGANIZER v5.0.0 - ADVANCED EDITION")
+    print("  Intelligent File Organization with Advanced Features")
+    print("=" * 80 + "\n")
+
+def print_config_info(config):
+    """Print configuration information"""
+    general = config.settings["general"]
+    logging_config = config.settings["logging"]
+    stats_config = config.settings["statistics"]
+    
+    print("⚙️  Configuration:")
+    print(f"   Delay: {general['delay_minutes']} minutes")
+    print(f"   Check Interval: {general['check_interval_seconds']} seconds")
+    print(f"   Log to File: {logging_config['log_to_file']}")
+    print(f"   Statistics: {stats_config['enabled']}")
+    print()
+
+def parse_args(argv=None):
+    """Command line options"""
+    parser = argparse.ArgumentParser(description="Windows File Organizer v" + __version__)
+    parser.add_argument("--config", default="config.json", help="configuration file")
+    parser.add_argument("--plan", nargs="?", const="-", metavar="FILE",
+                        help="resolve every existing file into a move plan without moving "
+                             "anything; print it, or write it to FILE as JSON")
+    parser.add_argument("--apply", metavar="FILE",
+                        help="execute a plan written by --plan, then exit")
+    parser.add_argument("--undo", metavar="SINCE",
+                        help="move back every journaled operation since SINCE "
+                             "(e.g. 2026-10-17 or 2026-10-17T14:30), then exit")
+    parser.add_argument("--until", metavar="UNTIL",
+                        help="end of the --undo time range (default: now)")
+    args = parser.parse_args(argv)
+    for option, value in (("--undo", args.undo), ("--until", args.until)):
+        if value is not None:
+            try:
+                parse_time(value)
+            except ValueError:
+                parser.error(f"{option}: invalid time {value!r}; use YYYY-MM-DD, "
+                             f"YYYY-MM-DDTHH:MM or YYYY-MM-DDTHH:MM:SS")
+    return args
+
+def parse_time(value):
+    """Timestamp for an ISO date/time given on the command line"""
+    return datetime.fromisoformat(value).timestamp()
+
+def main():
+    """Main application entry point"""
+    args = parse_args()
+    batch_mode = args.plan is not None or args.apply is not None
+    
+    # Print header
+    print_header()
+    
+    # Load configuration
+    print("📝 Loading configuration...")
+    try:
+        config = ConfigManager(args.config)
+    except ValueError as e:
+        print(f"❌ Invalid configuration in {args.config}: {e}")
+        sys.exit(1)
+    print("   ✓ Configuration loaded\n")
+    
+    # Setup logging
+    setup_logging(config)
+    atexit.register(stop_logging)
+    logger = logging.getLogger(__name__)
+    
+    # Initialize statistics (a plan is a dry run and records nothing)
+    stats_config = config.settings["statistics"]
+    statistics = StatisticsTracker(
+        stats_file=stats_config.get("stats_file", "statistics.json"),
+        enabled=stats_config.get("enabled", True) and args.plan is None,
+        flush_interval_seconds=stats_config.get("flush_interval_seconds", 30),
+        flush_every=stats_config.get("flush_every", 500)
+    )
+    atexit.register(statistics.close)
+    atexit.register(HashService.close_all)
+    
+    # Initialize content index
+    index_config = config.settings["index"]
+    content_index = None
+    index_file = index_config.get("index_file", "content_index.db")
+    if index_config.get("enabled", True) and (args.plan is None or os.path.exists(index_file)):
+        try:
+            content_index = ContentIndex(index_file, read_only=args.plan is not None)
+            atexit.register(content_index.close)
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️  Content index unavailable: {e}")
+    
+    # Open the move journal and finish anything a crash interrupted
+    journal_config = config.settings["journal"]
+    journal = None
+    if journal_config.get("enabled", True) and args.plan is not None:
+        # A dry run only reports what the next real run will recover
+        journal_file = journal_config.get("journal_file", "move_journal.jsonl")
+        if os.path.exists(journal_file):
+            plan_journal = MoveJournal.from_settings(config.settings)
+            interrupted = sum(1 for op in plan_journal.read().values() if op.get("state") == "intent")
+            plan_journal.close()
+            if interrupted:
+                logger.warning(f"⚠️  Journal: {interrupted:,} interrupted operations will be "
+                               f"recovered by the next run that moves files")
+    elif journal_config.get("enabled", True):
+        journal = MoveJournal.from_settings(config.settings)
+        atexit.register(journal.close)
+        resumed, rolled_back = journal.recover()
+        if resumed or rolled_back:
+            logger.info(f"📒 Journal recovery: {resumed:,} operations completed, "
+                        f"{rolled_back:,} rolled back")
+        journal.compact(journal_config.get("retention_days", 30))
+    
+    if args.undo is not None:
+        if journal is None:
+            logger.error("❌ --undo needs the move journal (journal.enabled)")
+            return
+        since = parse_time(args.undo)
+        until = parse_time(args.until) if args.until else None
+        mover = MoveEngine.from_settings(config.settings, hash_copies=False)
+        undone = journal.undo(since, until, mover, content_index)
+        logger.info(f"↩️  Undid {undone:,} operations")
+        journal.close()
+        if content_index is not None:
+            content_index.close()
+        statistics.close()
+        return
+    
+    # Flush statistics before dying on SIGTERM (Ctrl+C is handled below)
+    def handle_terminate(signum, frame):
+        raise KeyboardInterrupt
+    
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, handle_terminate)
+    if hasattr(signal, "SIGBREAK"):
+        signal.signal(signal.SIGBREAK, handle_terminate)
     
     # Print configuration info
     print_config_info(config)
@@ -526,51 +4454,137 @@ def main():
     # Setup file organizers
     observers = []
     handlers = []
+    wakeup = threading.Event()
     
-    logger.info("🔍 Setting up file monitors...\n")
+    events_config = config.settings["events"]
+    use_asyncio = config.settings["runtime"].get("mode", "threads") == "asyncio"
+    dispatcher = None
+    runtime = None
+    if use_asyncio:
+        watchers = runtime = AsyncRuntime.from_settings(handlers, config.settings)
+    elif events_config.get("shared_observer", False):
+        watchers = dispatcher = EventDispatcher(
+            workers=events_config.get("dispatch_workers", 2),
+            poller=SnapshotObserver.from_settings(config.settings)
+        )
+    else:
+        watchers = ObserverSet(SnapshotObserver.from_settings(config.settings))
+        observers.append(watchers)
     
-    for source_config in config.settings["sources"]:
-        if not source_config.get("enabled", True):
-            logger.info(f"⊘ Skipping disabled source: {source_config['name']}")
-            continue
-        
+    def create_handler(source_config):
+        """Create the handler for a source, or None if its folders are missing"""
         source_folder = str(Path.home() / source_config["folder"])
         dest_drive = source_config["destination_drive"]
         
         # Check source exists
         if not os.path.exists(source_folder):
             logger.warning(f"⚠️  Source not found: {source_folder}")
-            continue
+            return None
         
         # Check destination drive exists
         if not os.path.exists(dest_drive):
             logger.warning(f"⚠️  Destination drive not found: {dest_drive}")
+            return None
+        
+        handler = AdvancedFileOrganizerHandler(
+            source_config, config, statistics, content_index, wakeup, journal
+        )
+        logger.info(f"✓ Monitoring: {source_config['name']}")
+        logger.info(f"  Source: {source_folder}")
+        if handler.polling:
+            logger.info(f"  Polling every {watchers.poller.interval}s (watch_mode: {handler.watch_mode})")
+        logger.info(f"  Destination: {dest_drive}{source_config['destination_folder']}\n")
+        return handler
+    
+    logger.info("🔍 Setting up file monitors...\n")
+    
+    organize_existing = config.settings["general"].get("organize_existing_on_startup", False)
+    parallel_bulk = config.settings["bulk"].get("parallel", False)
+    
+    for source_config in config.settings["sources"]:
+        if not source_config.get("enabled", True):
+            logger.info(f"⊘ Skipping disabled source: {source_config['name']}")
             continue
         
-        # Create handler
-        handler = AdvancedFileOrganizerHandler(source_config, config, statistics)
+        handler = create_handler(source_config)
+        if handler is None:
+            continue
+        
+        # Plan/apply runs only need the handlers
+        if batch_mode:
+            handlers.append(handler)
+            continue
         
-        # Organize existing files if configured
-        if config.settings["general"].get("organize_existing_on_startup", False):
+        # Organize existing files if configured (parallel runs cover all sources below)
+        if organize_existing and not parallel_bulk:
             handler.organize_existing_files()
         
-        # Setup observer
-        observer = Observer()
-        observer.schedule(handler, source_folder, recursive=False)
-        observer.start()
+        # Setup observer (the asyncio runtime schedules its own once running)
+        if not use_asyncio:
+            watchers.add(handler)
         
-        observers.append(observer)
         handlers.append(handler)
-        
-        logger.info(f"✓ Monitoring: {source_config['name']}")
-        logger.info(f"  Source: {source_folder}")
-        logger.info(f"  Destination: {dest_drive}{source_config['destination_folder']}\n")
     
-    if not observers:
+    if not handlers:
         logger.error("❌ No valid sources to monitor!")
         logger.error("   Please check your config.json file.\n")
         return
     
+    if batch_mode:
+        if args.apply is not None:
+            plan = MovePlan.load(args.apply)
+            logger.info(f"📋 Applying plan {args.apply} ({len(plan.operations):,} operations)...")
+            apply_plan(plan, handlers)
+        else:
+            logger.info("📋 Planning moves for existing files (nothing will be moved)...")
+            plan = build_plan(handlers)
+            if args.plan == "-":
+                print_plan(plan)
+            else:
+                plan.save(args.plan)
+                print_plan(plan, show_operations=False)
+                logger.info(f"📝 Plan written to {args.plan}")
+        statistics.close()
+        if content_index is not None:
+            content_index.close()
+        if journal is not None:
+            journal.close()
+        return
+    
+    if dispatcher is not None:
+        dispatcher.start()
+        observers.append(dispatcher)
+        logger.info(f"✓ Shared observer watching {len(handlers)} sources "
+                    f"({len(dispatcher.queues)} dispatch workers)\n")
+    
+    # Stage metrics
+    metrics_config = config.settings["metrics"]
+    metrics = None
+    if metrics_config.get("enabled", False):
+        metrics = enable_metrics()
+        metrics.add_collector(lambda: runtime_metric_lines(statistics, handlers, dispatcher))
+        port = metrics_config.get("http_port", 0)
+        if port:
+            try:
+                metrics.start_server(port)
+                logger.info(f"📈 Metrics: http://127.0.0.1:{port}/metrics")
+            except OSError as e:
+                logger.warning(f"⚠️  Metrics endpoint unavailable on port {port}: {e}")
+        summary_interval = metrics_config.get("summary_interval_seconds", 60)
+        if summary_interval:
+            metrics.start_summary(summary_interval, logger)
+    
+    if organize_existing and parallel_bulk:
+        BulkOrganizer.from_settings(handlers, config.settings).run()
+    
+    # Watch config.json for edits
+    reloader = None
+    if config.settings["general"].get("reload_on_change", True):
+        reloader = ConfigReloader(config, handlers, watchers, create_handler, on_request=wakeup.set)
+        reloader.start()
+        observers.append(reloader)
+        logger.info(f"🔄 Watching {reloader.config_path} for changes\n")
+    
     print("=" * 80)
     print("🟢 File Organizer is now running...")
     print("💡 Press Ctrl+C to stop and view statistics")
@@ -578,29 +4592,49 @@ def main():
     
     # Main loop
     try:
-        check_interval = config.settings["general"].get("check_interval_seconds", 10)
-        
-        while True:
-            time.sleep(check_interval)
-            for handler in handlers:
-                handler.check_pending_files()
-    
+        if use_asyncio:
+            logger.info("⚡ Running on the asyncio runtime\n")
+            runtime.reloader = reloader
+            runtime.run()
+        else:
+            check_interval = config.settings["general"].get("check_interval_seconds", 10)
+            run_pending_loop(handlers, wakeup, check_interval, reloader=reloader)
     except KeyboardInterrupt:
-        print("\n\n" + "=" * 80)
-        print("🛑 Stopping File Organizer...")
-        print("=" * 80 + "\n")
-        
-        # Stop observers
-        for observer in observers:
-            observer.stop()
-        for observer in observers:
-            observer.join()
-        
-        # Show statistics
-        if config.settings["statistics"].get("show_on_exit", True):
-            statistics.print_statistics()
-        
-        logger.info("✓ File Organizer stopped successfully!\n")
+        pass
+    
+    print("\n\n" + "=" * 80)
+    print("🛑 Stopping File Organizer...")
+    print("=" * 80 + "\n")
+    
+    # Stop observers
+    for observer in observers:
+        observer.stop()
+    for observer in observers:
+        observer.join()
+    
+    if dispatcher is not None:
+        m = dispatcher.metrics()
+        logger.info(f"📨 Events dispatched: {m['events_dispatched']:,} "
+                    f"(max queue depth {m['max_queue_depth']:,}, "
+                    f"avg latency {m['avg_dispatch_latency_ms']:.2f} ms, "
+                    f"max {m['max_dispatch_latency_ms']:.2f} ms)")
+    
+    if metrics is not None:
+        metrics.stop()
+        logger.info(metrics.summary_line())
+    
+    # Persist any pending statistics
+    statistics.close()
+    if content_index is not None:
+        content_index.close()
+    if journal is not None:
+        journal.close()
+    
+    # Show statistics
+    if config.settings["statistics"].get("show_on_exit", True):
+        statistics.print_statistics()
+    
+    logger.info("✓ File Organizer stopped successfully!\n")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,63 @@
+"""
+MoveEngine device detection with stats from Windows directory listings
+
+Run from the v5.0.0 folder:
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import file_organizer_v5 as organizer
+
+
+def listing_stat(path):
+    """A stat like os.DirEntry.stat() returns on Windows: no device or inode"""
+    st = os.stat(path)
+    return SimpleNamespace(st_dev=0, st_ino=0, st_size=st.st_size,
+                           st_mtime=st.st_mtime, st_mtime_ns=st.st_mtime_ns)
+
+
+class ZeroDeviceStatTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.source = os.path.join(self.root, "report.pdf")
+        self.dest = os.path.join(self.root, "dest", "report.pdf")
+        os.makedirs(os.path.dirname(self.dest))
+        with open(self.source, "wb") as f:
+            f.write(b"%PDF-1.7\n" + b"x" * 1000)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_same_volume_is_same_device(self):
+        engine = organizer.MoveEngine(hash_copies=False)
+        self.assertTrue(engine.same_device(listing_stat(self.source), self.dest, self.source))
+
+    def test_same_volume_move_is_a_rename(self):
+        engine = organizer.MoveEngine(hash_copies=False)
+        with mock.patch.object(engine, "_copy_zero_copy") as copy:
+            engine.move(self.source, self.dest, listing_stat(self.source))
+        copy.assert_not_called()
+        self.assertFalse(os.path.exists(self.source))
+        self.assertTrue(os.path.exists(self.dest))
+
+    def test_journal_records_same_device(self):
+        journal = organizer.MoveJournal(os.path.join(self.root, "journal.jsonl"),
+                                        fsync_interval_seconds=0)
+        try:
+            op_id = journal.begin("move", self.source, self.dest, listing_stat(self.source))
+            self.assertTrue(journal.read()[op_id]["same_device"])
+        finally:
+            journal.close()
+
+
+if __name__ == "__main__":
+    unittest.main()